@@ -1,11 +1,24 @@
-import requests
-from icalendar import Calendar
-from datetime import datetime
-import pytz
+import os
+import sys
+from datetime import date, datetime, timezone
+import numpy as np
 import pandas as pd
 
+# Shared feed cache and event store live one directory up
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ical_sync import load_records, print_diff, sync_feed
+
+LOCAL_TZ = 'America/Chicago'  # Adjust for your timezone
+COLUMNS = ['title', 'description', 'date_assigned', 'date_due', 'uid']
+RECORD_FIELDS = ('title', 'description', 'uid', 'assigned_at', 'assigned_utc', 'due_at', 'due_utc')
+# Bump when assignment_from_event or a helper it calls (event_time) changes - stored records are re-converted
+CONVERTER_VERSION = 1
+
 def fetch_assignments(ical_url):
-    """Fetch and parse assignments from iCal feed"""
+    """
+    Sync the iCal feed into the local event store and return (assignments DataFrame, diff)
+    Only new or changed events (by UID, SEQUENCE and LAST-MODIFIED) are converted on each run
+    """
     # Add headers to mimic a browser request
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -16,62 +29,76 @@ def fetch_assignments(ical_url):
         'Upgrade-Insecure-Requests': '1'
     }
     
-    # Fetch the iCal data with headers
-    response = requests.get(ical_url, headers=headers)
-    if response.status_code != 200:
-        raise Exception(f"Failed to fetch iCal feed. Status code: {response.status_code}\nResponse: {response.text}")
-    
-    # Parse the iCal data
-    cal = Calendar.from_ical(response.text)
-    
-    # Store assignments
-    assignments = []
-    
-    # Process each event
-    for component in cal.walk():
-        if component.name == "VEVENT":
-            # Extract the date information
-            start_date = component.get('dtstart').dt
-            due_date = component.get('dtend').dt
-            
-            # Convert to datetime if date
-            if not isinstance(start_date, datetime):
-                start_date = datetime.combine(start_date, datetime.min.time())
-            if not isinstance(due_date, datetime):
-                due_date = datetime.combine(due_date, datetime.min.time())
-                
-            # Convert to local time if timezone-aware
-            local_tz = pytz.timezone('America/Chicago')  # Adjust for your timezone
-            if start_date.tzinfo is not None:
-                start_date = start_date.astimezone(local_tz)
-            if due_date.tzinfo is not None:
-                due_date = due_date.astimezone(local_tz)
-            
-            assignment = {
-                'title': str(component.get('summary', 'No Title')),
-                'description': str(component.get('description', 'No Description')),
-                'date_assigned': start_date.strftime('%Y-%m-%d %H:%M'),
-                'date_due': due_date.strftime('%Y-%m-%d %H:%M'),
-                'uid': str(component.get('uid', '')),
-            }
-            assignments.append(assignment)
-    
-    # Convert to DataFrame for easier handling
-    df = pd.DataFrame(assignments)
-    
-    # Sort by due date
-    if not df.empty:
-        df['date_due'] = pd.to_datetime(df['date_due'])
-        df = df.sort_values('date_due')
-    
-    return df
+    # Conditional fetch + UID-keyed upsert - an unchanged feed touches no events at all
+    diff = sync_feed(ical_url, assignment_from_event, headers=headers, version=CONVERTER_VERSION)
+    print_diff(diff)
+
+    # Stored records are already numeric, so the frame is built column by column
+    return assignments_frame(record_columns(load_records(ical_url))), diff
+
+def record_columns(records):
+    """Stored assignment records -> one list per RECORD_FIELDS field"""
+    columns = {name: [] for name in RECORD_FIELDS}
+    for record in records:
+        for name in RECORD_FIELDS:
+            columns[name].append(record[name])
+    return columns
+
+def event_time(value):
+    """
+    DTSTART/DTEND value -> (epoch seconds, is_utc)
+    Timezone-aware times become true UTC epochs; dates and floating times keep their wall clock
+    and are only localized later, in one vectorized step over the whole column
+    """
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            return value.timestamp(), True
+        return value.replace(tzinfo=timezone.utc).timestamp(), False
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day, tzinfo=timezone.utc).timestamp(), False
+    return float('nan'), False
+
+def assignment_from_event(component):
+    """Convert one VEVENT into a flat assignment record (times as epoch seconds)"""
+    assigned_at, assigned_utc = event_time(component.get('dtstart').dt)
+    due_at, due_utc = event_time(component.get('dtend').dt)
+    return {
+        'title': str(component.get('summary', 'No Title')),
+        'description': str(component.get('description', 'No Description')),
+        'uid': str(component.get('uid', '')),
+        'assigned_at': assigned_at,
+        'assigned_utc': assigned_utc,
+        'due_at': due_at,
+        'due_utc': due_utc,
+    }
+
+def local_times(seconds, is_utc):
+    """Vectorized epoch seconds -> naive local wall-clock times, to the minute"""
+    seconds = np.asarray(seconds, dtype='float64')
+    is_utc = np.asarray(is_utc, dtype=bool)
+    wall = pd.to_datetime(seconds, unit='s')
+    if is_utc.any():
+        local = pd.to_datetime(seconds, unit='s', utc=True).tz_convert(LOCAL_TZ).tz_localize(None)
+        wall = pd.DatetimeIndex(np.where(is_utc, local.values, wall.values))
+    return wall.floor('min')
+
+def assignments_frame(columns):
+    """Build the assignments DataFrame from typed columns, sorted by due date"""
+    df = pd.DataFrame({
+        'title': columns['title'],
+        'description': columns['description'],
+        'date_assigned': local_times(columns['assigned_at'], columns['assigned_utc']),
+        'date_due': local_times(columns['due_at'], columns['due_utc']),
+        'uid': columns['uid'],
+    }, columns=COLUMNS)
+    return df.sort_values('date_due', kind='stable', ignore_index=True)
 
 def main():
     # Your iCal URL
     ical_url = "https://sjs.myschoolapp.com/podium/feed/iCal.aspx?z=4ubN3SKrB8pAx8PiUv8nvUv9eF4pz2HTD5kUmwIL0KVzjZ4Ed0yB3y1XV0ZLBSGNxZWe5SeyYy8gXqZ3HtcAzw%3d%3d"
     try:
         # Fetch and process assignments
-        assignments_df = fetch_assignments(ical_url)
+        assignments_df, diff = fetch_assignments(ical_url)
         
         if assignments_df.empty:
             print("No assignments found in the feed.")
@@ -87,9 +114,12 @@ def main():
             print(f"Assigned: {row['date_assigned']}")
             print(f"Description: {row['description'][:100]}...")  # Show first 100 chars of description
         
-        # Save to CSV (optional)
-        assignments_df.to_csv('assignments.csv', index=False)
-        print("\nAssignments have been saved to 'assignments.csv'")
+        # Save to CSV (optional) - only rewritten when the feed actually changed
+        if diff['changed'] or not os.path.exists('assignments.csv'):
+            assignments_df.to_csv('assignments.csv', index=False)
+            print("\nAssignments have been saved to 'assignments.csv'")
+        else:
+            print("\nNo changes - 'assignments.csv' is up to date")
         
     except Exception as e:
         print(f"Error: {str(e)}")
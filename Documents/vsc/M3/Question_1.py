@@ -6,6 +6,7 @@ from typing import Callable
 import Question_1_suman as su
 
 def house_heat_equation(T_in_0:float, gpr, T_out:Callable, R_total:float, volume:float, time_step:float, time_end:float) -> np.ndarray:
+    # T_out(gpr, hours) must accept an array of hours (see Question_1_suman.Tout)
     # Constants
     T_in = T_in_0
     #specific heat of air = 1.005 kJ/kg*K
@@ -22,15 +23,18 @@ def house_heat_equation(T_in_0:float, gpr, T_out:Callable, R_total:float, volume
     # Runge-Kutta 4th order method for
     # dT/dt = -(T - T_out(t)) / (rho * volume * c * R_total)
     dt = time_step
-    def f(t, T_val):
-        return -(T_val - T_out(gpr, t)) / (rho * volume * c * R_total)
-    
+    # Every RK4 stage time (t, t + dt/2, t + dt) lies on the half-step grid, so T_out is
+    # evaluated once over that grid and the stages just index into it
+    stage_times = np.arange(2 * len(time) - 1) * (dt / 2)
+    T_stage = np.asarray(T_out(gpr, stage_times), dtype=float)
+    denom = rho * volume * c * R_total
+
     for i in range(len(time) - 1):
-        print(T[i])
-        k1 = dt * f(time[i], T[i])
-        k2 = dt * f(time[i] + dt / 2, T[i] + k1 / 2)
-        k3 = dt * f(time[i] + dt / 2, T[i] + k2 / 2)
-        k4 = dt * f(time[i] + dt, T[i] + k3)
+        T_start, T_mid, T_end = T_stage[2 * i], T_stage[2 * i + 1], T_stage[2 * i + 2]
+        k1 = dt * -(T[i] - T_start) / denom
+        k2 = dt * -(T[i] + k1 / 2 - T_mid) / denom
+        k3 = dt * -(T[i] + k2 / 2 - T_mid) / denom
+        k4 = dt * -(T[i] + k3 - T_end) / denom
         T[i + 1] = T[i] + (k1 + 2 * k2 + 2 * k3 + k4) / 6
     return T, time
 
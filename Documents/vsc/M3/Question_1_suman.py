@@ -34,10 +34,12 @@ def init_model():
 
 
 # Function to Get Outdoor Temperature at Any Hour
+# Accepts a single hour or an array of hours - pass every time you need at once,
+# one batched predict is far cheaper than a predict call per time point
 def Tout(gpr, hour):
-    hour = np.array([[hour]])
-    temp, _ = gpr.predict(hour, return_std=True)
-    return temp[0]
+    hours = np.asarray(hour, dtype=float)
+    temp = gpr.predict(hours.reshape(-1, 1))
+    return temp[0] if hours.ndim == 0 else temp
 
 
 
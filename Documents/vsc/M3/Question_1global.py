@@ -1,31 +1,50 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import time
-from SALib.sample import sobol
-from SALib.analyze import sobol as sobol_analyze
 import Question_1_suman as su
+from sobol_driver import adaptive_sobol
 
-def house_heat_equation(T_in_0, gpr, T_out, R_total, volume, time_step, time_end):
+# Set in each worker process by _init_worker
+_worker_gpr = None
+
+def house_heat_ensemble(T_in_0, gpr, T_out, R_total, volume, time_step, time_end):
+    """
+    RK4 for a whole batch of parameter sets at once - T_in_0, R_total and volume may be arrays
+    (broadcast together) and each step advances every member with one vectorized update
+    Returns the final indoor temperature of each member
+    """
     c = 1.005  # Specific heat of air (kJ/kg*K)
     rho = 1.225  # Density of air (kg/m^3)
     time = np.arange(0, time_end, time_step)
-    T = np.zeros(len(time))
-    T[0] = T_in_0
-    
-    def f(t, T_val):
-        return -(T_val - T_out(gpr, t)) / max(rho * volume * c * R_total, 1e-6)
-    
+    T_in_0, R_total, volume = np.broadcast_arrays(
+        np.asarray(T_in_0, dtype=float), np.asarray(R_total, dtype=float), np.asarray(volume, dtype=float))
+    T = T_in_0.copy()
+    denom = np.maximum(rho * volume * c * R_total, 1e-6)
+
+    # The outdoor temperature series is shared by every member: one batched GP predict over the
+    # half-step grid covers all RK4 stage times (t, t + dt/2, t + dt)
     dt = time_step
+    T_stage = np.asarray(T_out(gpr, np.arange(2 * len(time) - 1) * (dt / 2)), dtype=float)
+
     for i in range(len(time) - 1):
-        k1 = dt * f(time[i], T[i])
-        k2 = dt * f(time[i] + dt / 2, T[i] + k1 / 2)
-        k3 = dt * f(time[i] + dt / 2, T[i] + k2 / 2)
-        k4 = dt * f(time[i] + dt, T[i] + k3)
-        T[i + 1] = T[i] + (k1 + 2 * k2 + 2 * k3 + k4) / 6
-    
-    return T[-1]  # Return final temperature
+        T_start, T_mid, T_end = T_stage[2 * i], T_stage[2 * i + 1], T_stage[2 * i + 2]
+        k1 = dt * -(T - T_start) / denom
+        k2 = dt * -(T + k1 / 2 - T_mid) / denom
+        k3 = dt * -(T + k2 / 2 - T_mid) / denom
+        k4 = dt * -(T + k3 - T_end) / denom
+        T = T + (k1 + 2 * k2 + 2 * k3 + k4) / 6
+
+    return T  # Final temperature of each member
 
-def global_sensitivity_analysis():
+def _init_worker(gpr):
+    global _worker_gpr
+    _worker_gpr = gpr
+
+def final_temperatures(rows):
+    # rows: R_total, Volume, Initial_T_in
+    return house_heat_ensemble(rows[:, 2], _worker_gpr, su.Tout, rows[:, 0], rows[:, 1], 0.05, 24)
+
+def global_sensitivity_analysis(n_start=256, n_max=65536, tol=0.01, workers=None):
     gpr = su.init_model()
     sq_meters = 88
     perimeter = 4 * np.sqrt(sq_meters)
@@ -44,30 +63,18 @@ def global_sensitivity_analysis():
                    [T_in_0 * 0.8, T_in_0 * 1.2]]
     }
     
-    param_values = sobol.sample(problem, 256)  # Reduce samples for faster testing
-    print("Generated parameter samples:", param_values[:5])  # Debugging output
-    
-    results = []
-    for row in param_values:
-        print(f"Running with R_total={row[0]:.4f}, Volume={row[1]:.2f}, Initial_T_in={row[2]:.2f}")  # Debugging
-        results.append(house_heat_equation(row[2], gpr, su.Tout, row[0], row[1], 0.05, 24))
-    results = np.array(results)
-    
-    print("Results sample:", results[:10])
-    print("NaN count:", np.isnan(results).sum(), "Inf count:", np.isinf(results).sum())
-    
-    if np.var(results) == 0:
-        print("Warning: No variation in results, Sobol analysis will fail.")
-        return
-    
-    si = sobol_analyze.analyze(problem, results)
+    # N doubles from n_start until every S1/ST bootstrap interval is within tol
+    si, info = adaptive_sobol(problem, final_temperatures, n_start=n_start, n_max=n_max, tol=tol,
+                              workers=workers, initializer=_init_worker, initargs=(gpr,))
+    if not info['converged']:
+        print(f"Warning: confidence intervals still wider than {tol} at N={info['N']} (n_max)")
     
     print("Sobol Sensitivity Indices:")
     for i, name in enumerate(problem['names']):
-        print(f"{name} - S1: {si['S1'][i]:.4f}, ST: {si['ST'][i]:.4f}")
+        print(f"{name} - S1: {si['S1'][i]:.4f} ± {si['S1_conf'][i]:.4f}, ST: {si['ST'][i]:.4f} ± {si['ST_conf'][i]:.4f}")
     
     plt.figure(figsize=(8, 6))
-    plt.bar(problem['names'], si['ST'], color='skyblue', edgecolor='black')
+    plt.bar(problem['names'], si['ST'], yerr=si['ST_conf'], capsize=4, color='skyblue', edgecolor='black')
     plt.xlabel('Parameter')
     plt.ylabel('Total Sensitivity Index')
     plt.title('Global Sensitivity Analysis (Sobol Method)')
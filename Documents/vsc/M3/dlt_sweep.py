@@ -0,0 +1,74 @@
+import itertools
+import multiprocessing as mp
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Parallel DLT (orbit) smoothing-parameter sensitivity:
+# - the series is split once into a training window and a holdout of the last `holdout` periods
+# - fits are spread over long-lived worker processes; each worker imports orbit once and reuses
+#   it for every fit it runs
+# - every setting is scored on the holdout (SMAPE, RMSE) and collected into one results frame
+
+# Set in each worker by _init_worker
+_job = None
+
+
+def smoothing_grid(levels=(0.3, 0.5, 0.7), slopes=(0.3, 0.4, 0.5), seasonalities=(0.1, 0.2, 0.3)):
+    return [{'level_sm_input': level, 'slope_sm_input': slope, 'seasonality_sm_input': seasonality}
+            for level, slope, seasonality in itertools.product(levels, slopes, seasonalities)]
+
+
+def smape(actual, predicted):
+    # Same definition as orbit.diagnostics.metrics.smape
+    actual, predicted = np.asarray(actual, dtype=float), np.asarray(predicted, dtype=float)
+    return float(np.mean(2 * np.abs(predicted - actual) / (np.abs(actual) + np.abs(predicted))))
+
+
+def rmse(actual, predicted):
+    actual, predicted = np.asarray(actual, dtype=float), np.asarray(predicted, dtype=float)
+    return float(np.sqrt(np.mean((predicted - actual) ** 2)))
+
+
+def _init_worker(job):
+    global _job
+    from orbit.models import DLT
+
+    _job = (DLT, *job)
+
+
+def _fit_setting(setting):
+    DLT, train, test, response_col, date_col, dlt_kwargs = _job
+    started = time.perf_counter()
+    row = dict(setting)
+    try:
+        model = DLT(response_col=response_col, date_col=date_col, **{**dlt_kwargs, **setting})
+        model.fit(df=train)
+        predicted = model.predict(df=test[[date_col]])['prediction'].to_numpy()
+        row.update(smape=smape(test[response_col], predicted), rmse=rmse(test[response_col], predicted), error=None)
+    except Exception as e:
+        row.update(smape=np.nan, rmse=np.nan, error=f"{type(e).__name__}: {e}")
+    row['fit_seconds'] = time.perf_counter() - started
+    return row
+
+
+def dlt_sensitivity(df, grid, response_col, date_col='date', holdout=24, workers=None, **dlt_kwargs):
+    """
+    Fit DLT(**dlt_kwargs, **setting) for every setting in grid on all but the last `holdout` rows of df
+    and score each on those rows
+    Returns one row per setting (its parameters, smape, rmse, fit_seconds, error), best SMAPE first
+    """
+    df = df.sort_values(date_col).reset_index(drop=True)
+    train, test = df.iloc[:-holdout], df.iloc[-holdout:]
+    workers = workers or mp.cpu_count()
+
+    job = (train, test, response_col, date_col, dlt_kwargs)
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(job,)) as pool:
+        rows = list(pool.map(_fit_setting, grid, chunksize=max(len(grid) // (4 * workers), 1)))
+
+    results = pd.DataFrame(rows).sort_values(['smape', 'rmse'], na_position='last', ignore_index=True)
+    print(f"DLT sensitivity: {len(results)} settings, {results['error'].notna().sum()} failed, "
+          f"holdout {holdout} periods ({test[date_col].iloc[0]:%Y-%m} to {test[date_col].iloc[-1]:%Y-%m})")
+    return results
@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa  # parquet engine
+    import pyarrow.compute as pc
+    CACHE_FORMAT = "parquet"
+except ImportError:
+    pa = pc = None
+    CACHE_FORMAT = "pickle"
+
+# Shared data loading for the M3 forecasting scripts:
+# - each CSV is parsed once with its own date format, then sorted and put on a monthly (MS) index
+# - the normalized frame is stored in data_cache/ as parquet (pickle without pyarrow) and reused
+#   until the source file changes (size/mtime, confirmed by a content hash)
+# - load_aligned / load_forecast_exog do the elec/heating-degree alignment every script repeated
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(DATA_DIR, "data_cache")
+MANIFEST_PATH = os.path.join(CACHE_DIR, "manifest.json")
+# Bump when a normalizer changes, so cached frames are rebuilt
+NORMALIZER_VERSION = 2
+
+
+# "M/D/YYYY" or a year-less "M/D"; like the original new.py parser, "M/YYYY" also reads as year-less
+MONTH_DATE_PATTERN = r"^(?P<month>\d+)/(?P<second>\d+)(?:/(?P<year>\d{4}))?$"
+
+
+def normalize_month_dates(dates, start_year=1997):
+    """
+    Vectorized month-start dates for precipitation-style "M/D/YYYY" / "M/D" strings
+    Year-less rows take the year of the latest row that had one (start_year before the first),
+    plus one for every year-less January since; unparseable rows become NaT
+    """
+    month, year = _extract_month_year(pd.Series(dates).astype("string"))
+
+    # Each year-less January rolls the year over; explicit years reset the running year
+    rollovers = ((month == 1) & year.isna()).cumsum()
+    base = (year - rollovers).ffill().fillna(start_year)
+    years = base + rollovers
+
+    return pd.to_datetime(pd.DataFrame({"year": years.where(month.notna()), "month": month, "day": 1}),
+                          errors="coerce")
+
+
+def _extract_month_year(dates):
+    # float (NaN for no match / no year), not nullable Int64 - to_datetime can't assemble from NA
+    if pc is None:
+        parts = dates.str.extract(MONTH_DATE_PATTERN)
+        return (pd.to_numeric(parts["month"]).astype("float64"),
+                pd.to_numeric(parts["year"]).astype("float64"))
+
+    # Arrow's regex kernel runs the whole column in C++, ~10x faster than str.extract
+    matches = pc.extract_regex(pa.array(dates, type=pa.string()), MONTH_DATE_PATTERN)
+    columns = []
+    for field in ("month", "year"):
+        values = pc.struct_field(matches, field)
+        # An unmatched optional group comes back as "", a non-matching row as null
+        values = pc.if_else(pc.equal(values, ""), None, values)
+        columns.append(pd.Series(pc.cast(values, pa.float64()).to_numpy(zero_copy_only=False), index=dates.index))
+    return tuple(columns)
+
+
+def _month_index(df):
+    df = df.set_index("date").sort_index()
+    df = df[~df.index.duplicated(keep="last")]
+    return df.asfreq("MS")
+
+
+def _normalize_electricity(path):
+    df = pd.read_csv(path)
+    df["date"] = pd.to_datetime(df["date"], format="%b %Y")
+    return _month_index(df)
+
+
+def _normalize_heating_degree(path):
+    df = pd.read_csv(path)
+    df["date"] = pd.to_datetime(df["date"], format="%b %Y")
+    df = _month_index(df)
+    return df.replace([np.inf, -np.inf], np.nan).interpolate().bfill()
+
+
+def _normalize_heating_forecast(path):
+    df = pd.read_csv(path)
+    # tempSARIMA.py writes the date column as "month"
+    df = df.rename(columns={"month": "date"})
+    # The dates are ISO (YYYY-MM-DD). The scripts used to parse them with dayfirst=True, which swapped
+    # month and day wherever both were <= 12 (2027-02-01 read as 2 January) - forecast exog built here
+    # differs from theirs by up to ~750 heating degrees in those months
+    df["date"] = pd.to_datetime(df["date"], format="ISO8601")
+    return _month_index(df)
+
+
+def _normalize_precipitation(path):
+    df = pd.read_csv(path)
+    df["date"] = normalize_month_dates(df["date"])
+    return _month_index(df.dropna(subset=["date"]))
+
+
+DATASETS = {
+    "electricity": ("electricity.csv", _normalize_electricity),
+    "heating_degree": ("temp.csv", _normalize_heating_degree),
+    "heating_forecast": ("heating_degree_forecast.csv", _normalize_heating_forecast),
+    "precipitation": ("precipitation.csv", _normalize_precipitation),
+}
+
+
+def _read_manifest():
+    try:
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _write_manifest(manifest):
+    tmp_path = MANIFEST_PATH + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cache_path(name):
+    return os.path.join(CACHE_DIR, f"{name}.{'parquet' if CACHE_FORMAT == 'parquet' else 'pkl'}")
+
+
+def _read_cache(path):
+    df = pd.read_parquet(path) if CACHE_FORMAT == "parquet" else pd.read_pickle(path)
+    df.index.freq = "MS"  # parquet keeps the index but not its frequency
+    return df
+
+
+def _write_cache(df, path):
+    tmp_path = path + ".tmp"
+    if CACHE_FORMAT == "parquet":
+        df.to_parquet(tmp_path)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def load(name):
+    """Normalized monthly frame for a dataset in DATASETS, from the cache when its source is unchanged"""
+    filename, normalize = DATASETS[name]
+    source = os.path.join(DATA_DIR, filename)
+    stat = os.stat(source)
+    cache_path = _cache_path(name)
+
+    manifest = _read_manifest()
+    entry = manifest.get(name, {})
+    cache_ok = (entry.get("version") == NORMALIZER_VERSION and entry.get("format") == CACHE_FORMAT
+                and os.path.exists(cache_path))
+
+    if cache_ok and entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size:
+        return _read_cache(cache_path)
+
+    # mtime/size moved - only rebuild if the content actually changed
+    sha256 = _file_sha256(source)
+    if cache_ok and entry.get("sha256") == sha256:
+        df = _read_cache(cache_path)
+    else:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        df = normalize(source)
+        _write_cache(df, cache_path)
+
+    manifest[name] = {"version": NORMALIZER_VERSION, "format": CACHE_FORMAT, "mtime_ns": stat.st_mtime_ns,
+                      "size": stat.st_size, "sha256": sha256}
+    _write_manifest(manifest)
+    return df
+
+
+def load_electricity():
+    return load("electricity")
+
+
+def load_heating_degree():
+    return load("heating_degree")
+
+
+def load_precipitation():
+    return load("precipitation")
+
+
+def load_aligned():
+    """(electricity, heating degree) on the electricity index - heating degree taken from the nearest month"""
+    df_elec = load_electricity()
+    df_hd = load_heating_degree().reindex(df_elec.index, method="nearest")
+    return df_elec, df_hd
+
+
+def load_forecast_exog(periods=240, start=None):
+    """
+    Heating degree forecast for the `periods` months after `start` (default: the month after the
+    electricity data ends), interpolated over any gaps, with a 'date' column
+    """
+    if start is None:
+        start = load_electricity().index[-1] + pd.DateOffset(months=1)
+    date_range = pd.date_range(start=start, periods=periods, freq="MS")
+    forecast_hd = load("heating_forecast").reindex(date_range).interpolate(method="linear").bfill()
+    return forecast_hd.rename_axis("date").reset_index()
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import warnings
+
+import pandas as pd
+
+# Disk cache of fitted models, so re-running a script to tweak plots or tables doesn't refit:
+# - the key hashes the input series, exogenous data, model/fit kwargs and library versions
+# - each fitted result is pickled to its own file; a hit just unpickles it
+# - the cache is bounded in bytes and evicts the least recently used fits first
+
+CACHE_DIR = os.environ.get("M3_MODEL_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_cache"))
+MAX_BYTES = int(os.environ.get("M3_MODEL_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+
+def _hash_frame(digest, frame):
+    if frame is None:
+        digest.update(b"none")
+        return
+    frame = pd.DataFrame(frame)
+    digest.update(json.dumps([str(column) for column in frame.columns]).encode())
+    digest.update(pd.util.hash_pandas_object(frame, index=True).values.tobytes())
+
+
+def cache_key(kind, frames, params, versions=()):
+    digest = hashlib.sha256(kind.encode())
+    for frame in frames:
+        _hash_frame(digest, frame)
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    digest.update(json.dumps(list(versions)).encode())
+    return f"{kind}-{digest.hexdigest()[:24]}"
+
+
+def _path(key, cache_dir):
+    return os.path.join(cache_dir, f"{key}.pkl")
+
+
+def _evict(cache_dir, max_bytes, keep):
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(".pkl"):
+            path = os.path.join(cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    # Oldest use first - hits refresh the file's mtime
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+            total -= size
+        except FileNotFoundError:
+            pass
+
+
+def cached_fit(key, fit, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES):
+    """Return the cached result for key, or run fit(), store its result and return it"""
+    path = _path(key, cache_dir)
+    try:
+        with open(path, "rb") as f:
+            result = pickle.load(f)
+        os.utime(path)
+        print(f"Model cache hit: {key}")
+        return result
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        # Truncated file or a library upgrade broke unpickling - refit and overwrite
+        print(f"Model cache entry {key} unreadable ({type(e).__name__}), refitting")
+
+    result = fit()
+    tmp_path = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        handle, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(handle, "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        _evict(cache_dir, max_bytes, keep=path)
+    except Exception as e:
+        warnings.warn(f"Could not cache fitted model {key}: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return result
+
+
+def fit_sarimax(endog, exog=None, order=(1, 0, 0), seasonal_order=(0, 0, 0, 0), fit_kwargs=None, **model_kwargs):
+    """SARIMAX(endog, exog, order, seasonal_order, **model_kwargs).fit(**fit_kwargs), cached"""
+    import statsmodels
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+    fit_kwargs = fit_kwargs or {}
+    params = {'order': list(order), 'seasonal_order': list(seasonal_order), 'model': model_kwargs, 'fit': fit_kwargs}
+    key = cache_key("sarimax", (endog, exog), params, versions=(statsmodels.__version__,))
+    return cached_fit(key, lambda: SARIMAX(endog, exog=exog, order=order, seasonal_order=seasonal_order,
+                                           **model_kwargs).fit(**fit_kwargs))
+
+
+def fit_dlt(df, **dlt_kwargs):
+    """orbit DLT(**dlt_kwargs) fitted on df, cached - returns the fitted model ready for predict()"""
+    import orbit
+    from orbit.models import DLT
+
+    def fit():
+        model = DLT(**dlt_kwargs)
+        model.fit(df=df)
+        return model
+
+    key = cache_key("dlt", (df,), dlt_kwargs, versions=(orbit.__version__,))
+    return cached_fit(key, fit)
@@ -3,12 +3,10 @@ import numpy as np
 import matplotlib.pyplot as plt
 from orbit.models import DLT
 from orbit.diagnostics.plot import plot_predicted_data
+from m3_data import load_precipitation
 
-# Load the dataset
-df = pd.read_csv("precipitation.csv", parse_dates=["date"], index_col="date")
-
-# Ensure proper date format, sorting, and frequency
-df = df.sort_index().asfreq('MS')
+# Load the dataset (parsed, sorted and on a monthly index, cached - see m3_data.py)
+df = load_precipitation()
 
 # Define the DLT model
 dlt_model = DLT(
@@ -1,41 +1,26 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from statsmodels.tsa.statespace.sarimax import SARIMAX
-from orbit.models import DLT
+from model_cache import fit_dlt, fit_sarimax
+from m3_data import load_aligned, load_forecast_exog
 from orbit.diagnostics.plot import plot_predicted_data
 from orbit.diagnostics.metrics import smape
 
-# Load electricity consumption data
-df_elec = pd.read_csv("electricity.csv", parse_dates=["date"], index_col="date", dayfirst=True)
-df_elec = df_elec.sort_index().asfreq('MS')
+# Load electricity consumption and heating degree data, aligned on the monthly electricity index
+# (normalized once and cached in data_cache/ - see m3_data.py)
+df_elec, df_hd = load_aligned()
 
-# Load heating degree data
-df_hd = pd.read_csv("temp.csv", parse_dates=["date"], index_col="date", dayfirst=True)
-df_hd = df_hd.sort_index().asfreq('MS')
-
-# Handle missing or infinite values in df_hd
-df_hd = df_hd.replace([np.inf, -np.inf], np.nan).interpolate().fillna(method='bfill')
-
-# Load forecasted heating degree data
-forecast_hd = pd.read_csv("heating_degree_forecast.csv", parse_dates=["date"], index_col="date", dayfirst=True)
-forecast_hd = forecast_hd.sort_index().asfreq('MS')
-
-# Ensure forecast_hd has exactly 240 rows
-date_range = pd.date_range(start=df_elec.index[-1] + pd.DateOffset(months=1), periods=240, freq='MS')
-forecast_hd = forecast_hd.reindex(date_range).interpolate(method='linear').fillna(method='bfill')
-forecast_hd = forecast_hd.rename_axis("date").reset_index()
-
-# Align df_hd with df_elec to ensure matching lengths
-df_hd = df_hd.reindex(df_elec.index, method='nearest')
+# Forecasted heating degree data for the 240 months after the electricity data
+forecast_hd = load_forecast_exog(periods=240)
 
 # Fit SARIMAX model with updated exogenous formatting
-sarimax_model = SARIMAX(df_elec, exog=df_hd, order=(4,1,1), seasonal_order=(2,1,2,12))
-sarimax_result = sarimax_model.fit()
+# (cached on disk - scripts fitting the same data and settings share the result)
+sarimax_result = fit_sarimax(df_elec, exog=df_hd, order=(4,1,1), seasonal_order=(2,1,2,12), fit_kwargs={'maxiter': 500})
 forecast_sarimax = sarimax_result.get_forecast(steps=240, exog=forecast_hd.set_index("date"))
 
 # Fit BSTS (DLT) model with adjusted parameters
-dlt_model = DLT(
+dlt_model = fit_dlt(
+    df_elec.reset_index(),
     response_col='billion kilowatthours',
     date_col='date',
     estimator='stan-map',
@@ -47,7 +32,6 @@ dlt_model = DLT(
     num_warmup=1000,
     num_sample=2500
 )
-dlt_model.fit(df=df_elec.reset_index())
 forecast_bsts = dlt_model.predict(df=forecast_hd)
 
 # Extract peak values for 2025, 2030, and 2045
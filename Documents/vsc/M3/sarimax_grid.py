@@ -0,0 +1,228 @@
+import hashlib
+import itertools
+import json
+import multiprocessing as mp
+import sqlite3
+import time
+import warnings
+from multiprocessing.connection import wait
+
+import numpy as np
+import pandas as pd
+# Imported at module level - workers (forked or spawned) have statsmodels loaded before their fit starts
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+# Parallel, resumable SARIMAX order search:
+# - every (p,d,q)(P,D,Q,s) cell is fitted in its own worker process, which is killed if it runs
+#   past the per-fit timeout (a hung optimizer can't stall the whole search)
+# - each finished cell is written to a SQLite results table keyed by a hash of the data and fit
+#   settings, so an interrupted or repeated search only fits the cells that are still missing
+# - optional pruning skips cells whose simpler nested models are all far behind the best AIC
+#   among models with the same differencing
+# - the result is a ranked table of every cell, not just the winner
+
+RESULTS_PATH = "sarimax_grid.sqlite"
+COLUMNS = ['p', 'd', 'q', 'P', 'D', 'Q', 's']
+# SQLite column names are case-insensitive, so p/P etc. get distinct names in the table
+SQL_COLUMNS = ['ar', 'diff', 'ma', 'seasonal_ar', 'seasonal_diff', 'seasonal_ma', 'period']
+CELL_SELECT = ', '.join(f'{column} AS "{name}"' for column, name in zip(SQL_COLUMNS, COLUMNS))
+
+
+def order_grid(p=range(0, 3), d=range(0, 3), q=range(0, 3), P=range(0, 2), D=range(0, 2), Q=range(0, 2), s=(12,)):
+    return list(itertools.product(p, d, q, P, D, Q, s))
+
+
+def data_key(endog, exog=None, fit_kwargs=None):
+    """Hash of the series, exog and fit settings - results from other data are never reused"""
+    digest = hashlib.sha256()
+    for frame in (endog, exog):
+        if frame is not None:
+            digest.update(pd.util.hash_pandas_object(pd.DataFrame(frame), index=True).values.tobytes())
+    digest.update(json.dumps(fit_kwargs or {}, sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:16]
+
+
+def open_results(path=RESULTS_PATH):
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS fits (
+            data_key TEXT NOT NULL,
+            ar INTEGER, diff INTEGER, ma INTEGER,
+            seasonal_ar INTEGER, seasonal_diff INTEGER, seasonal_ma INTEGER, period INTEGER,
+            status TEXT NOT NULL,
+            aic REAL,
+            bic REAL,
+            converged INTEGER,
+            fit_seconds REAL,
+            error TEXT,
+            fitted_at REAL NOT NULL,
+            PRIMARY KEY (data_key, ar, diff, ma, seasonal_ar, seasonal_diff, seasonal_ma, period)
+        );
+    """)
+    return conn
+
+
+def _fit_cell(conn, endog, exog, cell, fit_kwargs):
+    # Runs in a child process and sends one result dict back over the pipe
+    started = time.perf_counter()
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            result = SARIMAX(endog, exog=exog, order=cell[:3], seasonal_order=cell[3:]).fit(**fit_kwargs)
+        conn.send({
+            'status': 'ok',
+            'aic': float(result.aic),
+            'bic': float(result.bic),
+            'converged': bool(result.mle_retvals.get('converged', False)) if result.mle_retvals else None,
+            'fit_seconds': time.perf_counter() - started,
+            'error': None,
+        })
+    except Exception as e:
+        conn.send({'status': 'error', 'aic': None, 'bic': None, 'converged': None,
+                   'fit_seconds': time.perf_counter() - started, 'error': f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def _save(db, key, cell, outcome):
+    with db:
+        db.execute(
+            "INSERT OR REPLACE INTO fits VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, *cell, outcome['status'], outcome['aic'], outcome['bic'],
+             None if outcome['converged'] is None else int(outcome['converged']),
+             outcome['fit_seconds'], outcome['error'], time.time())
+        )
+
+
+def _run_cells(db, key, cells, endog, exog, fit_kwargs, workers, timeout):
+    """Fit cells with at most `workers` child processes, terminating any that exceed the timeout"""
+    # The platform's default start method - fork is unsafe on macOS once numpy/BLAS is loaded
+    context = mp.get_context()
+    queue = list(cells)
+    running = {}  # receiving end of pipe -> (process, cell, started)
+
+    while queue or running:
+        while queue and len(running) < workers:
+            cell = queue.pop(0)
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=_fit_cell, args=(sender, endog, exog, cell, fit_kwargs), daemon=True)
+            process.start()
+            sender.close()
+            running[receiver] = (process, cell, time.monotonic())
+
+        now = time.monotonic()
+        next_deadline = min(started + timeout for _, _, started in running.values()) if timeout else None
+        ready = wait(list(running), timeout=max(next_deadline - now, 0) if next_deadline else None)
+
+        for receiver in ready:
+            process, cell, started = running.pop(receiver)
+            try:
+                outcome = receiver.recv()
+            except EOFError:
+                outcome = {'status': 'error', 'aic': None, 'bic': None, 'converged': None,
+                           'fit_seconds': time.monotonic() - started, 'error': f"worker exited with code {process.exitcode}"}
+            receiver.close()
+            process.join()
+            _save(db, key, cell, outcome)
+            print(f"{cell}: {outcome['status']} AIC={outcome['aic']} ({outcome['fit_seconds']:.1f}s)")
+
+        if timeout:
+            now = time.monotonic()
+            for receiver, (process, cell, started) in list(running.items()):
+                if now - started >= timeout:
+                    process.terminate()
+                    process.join()
+                    receiver.close()
+                    del running[receiver]
+                    _save(db, key, cell, {'status': 'timeout', 'aic': None, 'bic': None, 'converged': None,
+                                          'fit_seconds': now - started, 'error': f"exceeded {timeout}s"})
+                    print(f"{cell}: timeout after {timeout}s")
+
+
+def _parents(cell):
+    # Nested sub-models: one fewer AR/MA term (regular or seasonal), same differencing
+    for i in (0, 2, 3, 5):
+        if cell[i] > 0:
+            parent = list(cell)
+            parent[i] -= 1
+            yield tuple(parent)
+
+
+def ranked_table(db, key, cells=None):
+    """
+    Finished cells for this data (optionally only `cells`), grouped by differencing (d, D) and best
+    AIC first within each group, with the rank, AIC delta and Akaike weight inside the group
+    """
+    table = pd.read_sql_query(
+        f"SELECT {CELL_SELECT}, status, aic, bic, converged, fit_seconds, error FROM fits WHERE data_key = ?",
+        db, params=(key,)
+    )
+    if cells is not None:
+        # The table may hold results from a larger earlier grid
+        requested = pd.MultiIndex.from_tuples(cells, names=COLUMNS)
+        table = table[pd.MultiIndex.from_frame(table[COLUMNS]).isin(requested)]
+    table['converged'] = table['converged'].astype('boolean')
+    # Models with different differencing (d, D) are fitted to different series, so their AICs are
+    # not comparable - ranks, deltas and Akaike weights are all taken within each (d, D) group
+    table = table.sort_values(['d', 'D', 'aic', 'bic'], na_position='last', ignore_index=True)
+    by_differencing = table.groupby(['d', 'D'])
+    table.insert(0, 'rank', by_differencing.cumcount() + 1)
+    table['delta_aic'] = table['aic'] - by_differencing['aic'].transform('min')
+    weights = np.exp(-0.5 * table['delta_aic'])
+    table['akaike_weight'] = weights / weights.groupby([table['d'], table['D']]).transform('sum')
+    return table
+
+
+def grid_search(endog, exog=None, cells=None, workers=None, timeout=600, prune_margin=None,
+                fit_kwargs=None, path=RESULTS_PATH, retry_failed=False):
+    """
+    Fit every SARIMAX order in `cells` (default order_grid()) and return the ranked results table
+    Cells already in the results table for this data and fit settings are skipped
+    prune_margin: if set, cells are fitted in waves of increasing AR/MA terms, and a cell is skipped
+    when all of its nested one-term-simpler models finished with AIC worse than best + prune_margin,
+    best being the lowest AIC with the same (d, D) (a heuristic - disable it for an exhaustive search)
+    """
+    cells = [tuple(cell) for cell in (cells or order_grid())]
+    fit_kwargs = {'maxiter': 500, 'disp': False, **(fit_kwargs or {})}
+    workers = workers or mp.cpu_count()
+    key = data_key(endog, exog, fit_kwargs)
+
+    db = open_results(path)
+    try:
+        done = {}
+        for row in db.execute(f"SELECT {', '.join(SQL_COLUMNS)}, status, aic FROM fits WHERE data_key = ?", (key,)):
+            done[tuple(row[:7])] = (row[7], row[8])
+        skip = {'ok', 'error', 'timeout', 'pruned'} if prune_margin is not None else {'ok', 'error', 'timeout'}
+        if retry_failed:
+            skip -= {'error', 'timeout'}
+        todo = [cell for cell in cells if done.get(cell, (None,))[0] not in skip]
+        print(f"SARIMAX grid: {len(cells)} cells, {len(cells) - len(todo)} already in {path}, {len(todo)} to fit")
+
+        if prune_margin is None:
+            _run_cells(db, key, todo, endog, exog, fit_kwargs, workers, timeout)
+        else:
+            # Simpler models first, so their AICs are known before deciding on larger ones
+            waves = itertools.groupby(sorted(todo, key=lambda c: c[0] + c[2] + c[3] + c[5]),
+                                      key=lambda c: c[0] + c[2] + c[3] + c[5])
+            for _, wave in waves:
+                aics = {tuple(row[:7]): row[7] for row in db.execute(
+                    f"SELECT {', '.join(SQL_COLUMNS)}, aic FROM fits WHERE data_key = ? AND status = 'ok'", (key,))}
+                # Best AIC per differencing (d, D) - AICs of differently differenced models don't compare
+                best_by_differencing = {}
+                for cell, aic in aics.items():
+                    group = (cell[1], cell[4])
+                    best_by_differencing[group] = min(aic, best_by_differencing.get(group, np.inf))
+                fit_now = []
+                for cell in wave:
+                    best = best_by_differencing.get((cell[1], cell[4]), np.inf)
+                    parents = [aics.get(parent) for parent in _parents(cell)]
+                    if parents and all(aic is not None and aic > best + prune_margin for aic in parents):
+                        _save(db, key, cell, {'status': 'pruned', 'aic': None, 'bic': None, 'converged': None,
+                                              'fit_seconds': 0.0, 'error': f"nested models > best AIC + {prune_margin}"})
+                    else:
+                        fit_now.append(cell)
+                _run_cells(db, key, fit_now, endog, exog, fit_kwargs, workers, timeout)
+
+        return ranked_table(db, key, cells)
+    finally:
+        db.close()
@@ -0,0 +1,95 @@
+import multiprocessing as mp
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+from model_cache import fit_sarimax
+
+# Exogenous-noise sensitivity sweep for SARIMAX:
+# - the baseline model is fitted once (through the model cache)
+# - every perturbed variant starts its optimizer from the baseline parameters, which are already
+#   close to the optimum when the exog barely moves, so each refit takes a handful of iterations;
+#   a warm start that fails to converge is retried cold, and rows that never converge are flagged
+# - (noise level, replicate) refits run in parallel and the result is a distribution of AIC and
+#   forecast deltas per noise level instead of a single draw
+
+# Set in each worker by _init_worker
+_sweep = None
+
+
+def _init_worker(sweep):
+    global _sweep
+    _sweep = sweep
+
+
+def _refit(task):
+    noise, replicate, seed = task
+    endog, exog, order, seasonal_order, start_params, fit_kwargs, forecast_exog, baseline_forecast = _sweep
+    noisy_exog = exog + np.random.default_rng(seed).normal(0, noise, exog.shape)
+
+    started = time.perf_counter()
+    model = SARIMAX(endog, exog=noisy_exog, order=order, seasonal_order=seasonal_order)
+    # A warm start can stall at the baseline parameters (L-BFGS stopping after 0 iterations, not converged);
+    # its AIC would just be the baseline scored on the noisy exog, so retry from the default start
+    # parameters, then with Nelder-Mead
+    for start, kwargs in (('warm', {'start_params': start_params}), ('cold', {}), ('cold-nm', {'method': 'nm'})):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            result = model.fit(**{**fit_kwargs, **kwargs})
+        converged = bool(result.mle_retvals.get('converged', False)) if result.mle_retvals else False
+        if converged:
+            break
+    row = {
+        'noise': noise,
+        'replicate': replicate,
+        'aic': float(result.aic),
+        'converged': converged,
+        'start': start,
+        'iterations': result.mle_retvals.get('iterations') if result.mle_retvals else None,
+        'fit_seconds': time.perf_counter() - started,
+    }
+    if forecast_exog is not None:
+        delta = result.get_forecast(steps=len(forecast_exog), exog=forecast_exog).predicted_mean.to_numpy() - baseline_forecast
+        row['forecast_delta_mean'] = float(np.mean(delta))
+        row['forecast_delta_max_abs'] = float(np.max(np.abs(delta)))
+    return row
+
+
+def noise_sweep(endog, exog, order, seasonal_order, noise_levels, replicates=20, forecast_exog=None,
+                fit_kwargs=None, workers=None, seed=0):
+    """
+    Refit SARIMAX with Gaussian noise (sd = each noise level) added to exog, `replicates` times per level
+    Returns (runs, summary): one row per refit, and per-level quantiles of delta AIC and forecast deltas
+    (deltas are relative to the baseline fit on the unperturbed exog; refits that did not converge
+    even after the cold retries are kept with converged=False and NaN deltas, so the summary's
+    counts are converged refits only)
+    """
+    fit_kwargs = {'maxiter': 500, 'disp': False, **(fit_kwargs or {})}
+    baseline = fit_sarimax(endog, exog=exog, order=order, seasonal_order=seasonal_order, fit_kwargs=fit_kwargs)
+    baseline_forecast = None
+    if forecast_exog is not None:
+        baseline_forecast = baseline.get_forecast(steps=len(forecast_exog), exog=forecast_exog).predicted_mean.to_numpy()
+
+    # Independent, reproducible streams for every (level, replicate); a zero noise level draws
+    # nothing random, so it is fitted once
+    seeds = np.random.SeedSequence(seed).spawn(len(noise_levels) * replicates)
+    tasks = [(noise, replicate, seeds[i * replicates + replicate])
+             for i, noise in enumerate(noise_levels) for replicate in range(1 if noise == 0 else replicates)]
+
+    sweep = (endog, exog, order, seasonal_order, np.asarray(baseline.params), fit_kwargs, forecast_exog, baseline_forecast)
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(sweep,)) as pool:
+        runs = pd.DataFrame(list(pool.map(_refit, tasks, chunksize=max(len(tasks) // (4 * (workers or mp.cpu_count())), 1))))
+
+    # Deltas of refits that never converged are not meaningful - they stay in runs (flagged) but are NaN
+    runs['delta_aic'] = (runs['aic'] - baseline.aic).where(runs['converged'])
+    metrics = ['delta_aic'] + [column for column in ('forecast_delta_mean', 'forecast_delta_max_abs') if column in runs]
+    runs[metrics[1:]] = runs[metrics[1:]].where(runs['converged'], axis=0)
+    summary = runs.groupby('noise')[metrics].describe(percentiles=[0.05, 0.5, 0.95])
+    summary[('fit', 'converged_share')] = runs.groupby('noise')['converged'].mean()
+    summary[('fit', 'cold_retry_share')] = runs.groupby('noise')['start'].apply(lambda start: (start != 'warm').mean())
+    summary[('fit', 'mean_iterations')] = runs.groupby('noise')['iterations'].mean()
+    return runs, summary
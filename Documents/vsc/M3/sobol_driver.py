@@ -0,0 +1,109 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from scipy.stats import qmc
+from SALib.analyze import sobol as sobol_analyze
+from SALib.util import scale_samples
+
+# Adaptive Sobol sensitivity analysis:
+# - Saltelli samples are generated chunk by chunk from one scrambled Sobol' sequence, so doubling N
+#   only evaluates the new points (the first N points of the sequence are the N-sample design)
+# - chunks are evaluated across a process pool and streamed into a memory-mapped results array
+# - S1/ST and their bootstrap confidence intervals are recomputed after every doubling, stopping
+#   as soon as every interval half-width is within tolerance
+
+
+def saltelli_rows(base, num_vars, calc_second_order=True):
+    """Saltelli cross-sampling of base points (n, 2D) in [0, 1) -> rows in SALib's sample order"""
+    A, B = base[:, :num_vars], base[:, num_vars:]
+    blocks = [A]
+    for k in range(num_vars):
+        AB = A.copy()
+        AB[:, k] = B[:, k]
+        blocks.append(AB)
+    if calc_second_order:
+        for k in range(num_vars):
+            BA = B.copy()
+            BA[:, k] = A[:, k]
+            blocks.append(BA)
+    blocks.append(B)
+    return np.stack(blocks, axis=1).reshape(-1, num_vars)
+
+
+def adaptive_sobol(problem, evaluate, n_start=256, n_max=65536, tol=0.01, calc_second_order=True,
+                   chunk_rows=8192, workers=None, initializer=None, initargs=(), num_resamples=100,
+                   conf_level=0.95, seed=None, results_path=None):
+    """
+    Run Sobol analysis with N = n_start, 2 n_start, ... until every S1 and ST confidence half-width
+    is <= tol, or N would exceed n_max
+    evaluate(rows) -> outputs must be a picklable module-level function; initializer(*initargs)
+    runs once in each worker (e.g. to hand over a fitted model)
+    Returns (Si of the last N, info) where info holds N, evaluations, converged, history and results_path
+    """
+    if n_start & (n_start - 1) or n_max & (n_max - 1):
+        raise ValueError("n_start and n_max must be powers of 2 (Sobol' balance properties)")
+
+    num_vars = problem['num_vars']
+    rows_per_sample = 2 * num_vars + 2 if calc_second_order else num_vars + 2
+    samples_per_chunk = max(chunk_rows // rows_per_sample, 1)
+
+    keep_results = results_path is not None
+    if results_path is None:
+        handle, results_path = tempfile.mkstemp(suffix='.npy')
+        os.close(handle)
+    # Sized for n_max up front - pages are only touched as results arrive
+    Y = np.lib.format.open_memmap(results_path, mode='w+', dtype='float64', shape=(n_max * rows_per_sample,))
+
+    sequence = qmc.Sobol(d=2 * num_vars, scramble=True, seed=seed)
+    pool = ProcessPoolExecutor(workers, initializer=initializer, initargs=initargs) if workers != 1 else None
+    if pool is None and initializer is not None:
+        initializer(*initargs)
+
+    history = []
+    n = 0
+    target = n_start
+    try:
+        while True:
+            # Only the new points of the sequence are generated and evaluated
+            base = sequence.random(target - n)
+            pending = {}
+            for start in range(0, len(base), samples_per_chunk):
+                rows = scale_samples(saltelli_rows(base[start:start + samples_per_chunk], num_vars, calc_second_order), problem)
+                offset = (n + start) * rows_per_sample
+                if pool is None:
+                    Y[offset:offset + len(rows)] = evaluate(rows)
+                else:
+                    pending[pool.submit(evaluate, rows)] = offset
+            for future in as_completed(pending):
+                outputs = future.result()
+                offset = pending[future]
+                Y[offset:offset + len(outputs)] = outputs
+            n = target
+
+            Si = sobol_analyze.analyze(problem, np.asarray(Y[:n * rows_per_sample]), calc_second_order=calc_second_order,
+                                       num_resamples=num_resamples, conf_level=conf_level, seed=seed)
+            width = float(max(np.nanmax(Si['S1_conf']), np.nanmax(Si['ST_conf'])))
+            history.append({'N': n, 'evaluations': n * rows_per_sample, 'max_conf': width})
+            print(f"N={n}: {n * rows_per_sample} evaluations, max confidence half-width {width:.4f} (tol {tol})")
+
+            if width <= tol or target * 2 > n_max:
+                break
+            target *= 2
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        Y.flush()
+        del Y
+        if not keep_results:
+            os.remove(results_path)
+
+    info = {
+        'N': n,
+        'evaluations': n * rows_per_sample,
+        'converged': history[-1]['max_conf'] <= tol,
+        'history': history,
+        'results_path': results_path if keep_results else None,
+    }
+    return Si, info
@@ -3,12 +3,10 @@ import numpy as np
 import matplotlib.pyplot as plt
 from statsmodels.tsa.statespace.sarimax import SARIMAX
 from pmdarima import auto_arima
+from m3_data import load_heating_degree
 
-# Load the dataset
-df = pd.read_csv("temp.csv", parse_dates=["date"], index_col="date")
-
-# Ensure proper date format, sorting, and frequency
-df = df.sort_index().asfreq('MS')
+# Load the dataset (parsed, sorted and on a monthly index, cached - see m3_data.py)
+df = load_heating_degree()
 
 # Find optimal SARIMA parameters using auto_arima
 auto_model = auto_arima(df["heating_degree"], seasonal=True, m=12, trace=True)
@@ -1,33 +1,48 @@
-from quart import Quart, request, jsonify
+from quart import Quart, Response, request, jsonify, send_file
 import socketio
 import asyncio
+import json
 import uuid
 import time
 import logging
-import sys
+import os
+import re
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 import threading
 from concurrent.futures import ThreadPoolExecutor
 from base_scraper import ScraperFactory, ScraperMode, ScraperType
+from result_cache import LatestResultCache, PreEncodedJSON
+from emission import EmissionManager
+from logging_setup import setup_logging, EventLoopLagMonitor
+from browser_pool import BrowserPool
+from document_store import DocumentStore
 
-# CRITICAL: Import all scraper modules to ensure registration
-# This must happen BEFORE any scraper factory usage
-import main_scraper  # This triggers the registration
-import api_scraper  
-import regatta_network_scraper
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('regatta_scraper.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+# Register scrapers by name - each module (and Playwright with it) is imported on first use
+ScraperFactory.register_lazy('clubspot_main', 'main_scraper', 'ClubSpotMainScraper')
+ScraperFactory.register_lazy('clubspot_api', 'api_scraper', 'ClubSpotAPIScraper')
+ScraperFactory.register_lazy('regatta_network', 'regatta_network_scraper', 'RegattaNetworkScraper')
+
+# One browser shared by all scrapers, launched on first use or pre-warmed at startup
+browser_pool = BrowserPool()
+ScraperFactory.set_browser_pool(browser_pool)
+
+# Content-addressed cache of event PDFs with text extraction and amendment tracking
+document_store = DocumentStore(os.environ.get(
+    'REGATTA_DOCUMENT_CACHE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'document_cache')))
+ScraperFactory.set_document_store(document_store)
+
+# Set REGATTA_PREWARM_BROWSER=1 to launch the browser before /health reports ready
+PREWARM_BROWSER = os.environ.get('REGATTA_PREWARM_BROWSER', '').lower() in ('1', 'true', 'yes')
+warmup_state = {'ready': not PREWARM_BROWSER, 'error': None, 'seconds': None}
+# Set up logging - file/stdout writes happen on a background thread, not the event loop
+setup_logging('regatta_scraper.log')
 
 logger = logging.getLogger(__name__)
 
+# Tracks how long the event loop is blocked (reported by /health)
+loop_lag_monitor = EventLoopLagMonitor()
+
 # Verify scrapers are registered at startup
 def verify_scrapers():
     """Verify that all expected scrapers are registered"""
@@ -53,8 +68,11 @@ sio = socketio.AsyncServer(
         "https://*.regatta-results.com"
     ],
     async_mode='asgi',
-    logger=True,
-    engineio_logger=True,
+    # Lets cached updates be emitted without re-serializing them
+    json=PreEncodedJSON,
+    # Levels for these come from logging_setup (WARNING unless overridden per subsystem)
+    logger=logging.getLogger('socketio'),
+    engineio_logger=logging.getLogger('engineio'),
     transports=['websocket'],
     ping_timeout=60,
     ping_interval=25,
@@ -79,6 +97,10 @@ class SessionManager:
         self._cleanup_task_needed = False
         # Increased thread pool for better concurrency
         self.thread_pool = ThreadPoolExecutor(max_workers=20)
+        # Latest encoded update per session/URL for instant snapshots on join
+        self.result_cache = LatestResultCache()
+        # Per-client bounded outboxes so slow clients never stall a scrape loop
+        self.emitter = EmissionManager(sio)
         self.start_cleanup_task()
     
     async def create_session(self, url: str, client_id: Optional[str] = None, 
@@ -274,6 +296,8 @@ class SessionManager:
                 await self.stop_session(session_id)
                 await asyncio.sleep(1)
                 del self.sessions[session_id]
+                self.result_cache.drop_session(session_id)
+                self.emitter.drop_session(session_id)
                 logger.info(f"Removed session {session_id}")
     
     async def update_activity(self, session_id: str):
@@ -282,6 +306,28 @@ class SessionManager:
             if session_id in self.sessions:
                 self.sessions[session_id]['last_activity'] = datetime.now()
     
+    async def publish_update(self, session_id: str, event: str, payload: Dict[str, Any], cache: bool = True) -> int:
+        """
+        Queue an update for every client in a session without waiting on the network
+        Cached updates are stamped with a sequence number and encoded once for all recipients
+        Returns the number of clients the update was queued for
+        """
+        if not cache:
+            return self.emitter.publish(session_id, event, payload)
+        
+        async with self.lock:
+            session = self.sessions.get(session_id)
+            url_key = (session['scraper_type'], session['url']) if session else None
+        cached = self.result_cache.store(session_id, event, payload, url_key=url_key)
+        return self.emitter.publish(session_id, event, cached.payload, cached.seq)
+
+    async def get_cached_update(self, session_id: str):
+        """Get the latest cached update for a session, or for its URL if the session has none yet"""
+        async with self.lock:
+            session = self.sessions.get(session_id)
+            url_key = (session['scraper_type'], session['url']) if session else None
+        return self.result_cache.get(session_id, url_key=url_key)
+
     async def get_session_info(self, session_id: str) -> Dict[str, Any]:
         """Get session information"""
         async with self.lock:
@@ -342,12 +388,42 @@ session_manager = SessionManager()
 quart_app = Quart(__name__)
 quart_app.config['SECRET_KEY'] = 'sumans-key-quart-180825'
 
+async def warm_up():
+    """Import scraper modules and launch a warm browser with a pre-opened context"""
+    started = time.perf_counter()
+    try:
+        ScraperFactory.load_all()
+        await browser_pool.prewarm()
+    except Exception as e:
+        warmup_state['error'] = str(e)
+        logger.error(f"Browser pre-warm failed, scrapers will launch on demand: {e}")
+    finally:
+        warmup_state['seconds'] = time.perf_counter() - started
+        warmup_state['ready'] = True
+        logger.info(f"Warm-up finished in {warmup_state['seconds']:.2f}s")
+
+@quart_app.before_serving
+async def start_monitors():
+    """Start background monitors (and the optional browser warm-up) once the event loop is running"""
+    loop_lag_monitor.start()
+    if PREWARM_BROWSER:
+        asyncio.create_task(warm_up())
+
+@quart_app.after_serving
+async def shutdown_browser_pool():
+    """Close the shared browser and document store on shutdown"""
+    await browser_pool.close()
+    await document_store.close()
+
 # API Routes
 @quart_app.route('/health', methods=['GET'])
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint - reports 503 until the optional browser warm-up has finished"""
     return jsonify({
-        "status": "healthy",
+        "status": "healthy" if warmup_state['ready'] else "warming",
+        "warmup": warmup_state,
+        "browser_pool": browser_pool.get_stats(),
+        "document_store": document_store.get_stats(),
         "active_sessions": len(session_manager.sessions),
         "available_scrapers": ScraperFactory.list_available_scrapers(),
         "registered_scrapers": {
@@ -355,9 +431,11 @@ async def health_check():
             "clubspot_api": "API discovery scraper", 
             "regatta_network": "Regatta Network results scraper"# Add others as they're migrated
         },
+        "result_cache": session_manager.result_cache.get_stats(),
+        "event_loop_lag": loop_lag_monitor.get_stats(),
         "timestamp": datetime.now().isoformat(),
         "version": "2.0.0"  # Update version
-    })
+    }), 200 if warmup_state['ready'] else 503
 
 @quart_app.route('/start', methods=['POST'])
 async def start_scraping():
@@ -537,6 +615,45 @@ async def discover_only():
             "combinations": []
         }), 500
 
+SHA256_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+@quart_app.route('/documents/changes', methods=['GET'])
+async def get_document_changes():
+    """Which PDF documents were added, changed or removed at the last scrape of an event page"""
+    try:
+        url = request.args.get('url', '').strip()
+        if not url:
+            return jsonify({"error": "url query parameter is required"}), 400
+        
+        changes = document_store.get_changes(url)
+        if changes is None:
+            return jsonify({"error": "No documents have been synced for this URL"}), 404
+        return jsonify({"url": url, "changes": changes})
+    except Exception as e:
+        logger.error(f"Error getting document changes: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@quart_app.route('/documents/<sha256>', methods=['GET'])
+async def get_document(sha256):
+    """Serve a cached PDF by content hash - the content never changes, so clients may cache it forever"""
+    if not SHA256_PATTERN.match(sha256) or not document_store.has_document(sha256):
+        return jsonify({"error": "Document not found"}), 404
+    
+    response = await send_file(document_store.object_path(sha256), mimetype='application/pdf')
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+@quart_app.route('/documents/<sha256>/text', methods=['GET'])
+async def get_document_text(sha256):
+    """Extracted text of a cached PDF, for search and diffing"""
+    if not SHA256_PATTERN.match(sha256) or not document_store.has_document(sha256):
+        return jsonify({"error": "Document not found"}), 404
+    
+    text = document_store.get_text(sha256)
+    if text is None:
+        return jsonify({"status": "pending", "message": "Text extraction has not finished"}), 202
+    return Response(text, mimetype='text/plain')
+
 @quart_app.route('/scrape-regatta-network', methods=['POST'])
 async def scrape_regatta_results():
     """Scrape Regatta Network results and return data directly via HTTP"""
@@ -595,6 +712,176 @@ async def scrape_regatta_results():
             "regatta_data": None
         }), 500
 
+@quart_app.route('/scrape-regatta-network/stream', methods=['GET', 'POST'])
+async def stream_regatta_results():
+    """
+    Scrape Regatta Network results progressively
+    Sends event_info first, then each division as soon as it is extracted, then a complete message
+    NDJSON by default; Server-Sent Events with ?format=sse or Accept: text/event-stream
+    """
+    try:
+        data = await request.get_json(silent=True) or {}
+        url = (data.get('url') or request.args.get('url', '')).strip()
+        
+        if not url:
+            return jsonify({"error": "URL is required"}), 400
+        
+        # Validate URL format
+        if "regattanetwork.com" not in url:
+            return jsonify({"error": "URL must be from regattanetwork.com"}), 400
+        
+        use_sse = (request.args.get('format') == 'sse'
+                   or 'text/event-stream' in request.headers.get('Accept', ''))
+        
+        logger.info(f"Starting streamed regatta results scraping for URL: {url}")
+        
+        scraper_instance = ScraperFactory.create_scraper('regatta_network', ScraperMode.SINGLE)
+        scraper_instance.set_socketio_and_session_manager(sio, session_manager)
+        
+    except Exception as e:
+        logger.error(f"Error in scrape-regatta-network stream route: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+    
+    def frame(part: str, payload: Any, started: float) -> str:
+        message = json.dumps({
+            "type": part,
+            "data": payload,
+            "elapsed_seconds": round(time.perf_counter() - started, 3)
+        }, default=str)
+        if use_sse:
+            return f"event: {part}\ndata: {message}\n\n"
+        return message + "\n"
+    
+    async def generate():
+        started = time.perf_counter()
+        try:
+            async for part, payload in scraper_instance.stream_single(url):
+                yield frame(part, payload, started)
+            logger.info(f"Streamed regatta results scraping finished for URL: {url}")
+        except Exception as e:
+            logger.error(f"Error in streamed regatta results scraping: {e}")
+            yield frame("error", {"error": f"Scraping failed: {str(e)}"}, started)
+    
+    response = Response(generate(), mimetype='text/event-stream' if use_sse else 'application/x-ndjson')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.timeout = None
+    return response
+
+# Batch scraping limits
+MAX_BATCH_ITEMS = 100
+DEFAULT_BATCH_CONCURRENCY = 4
+MAX_BATCH_CONCURRENCY = 8
+BATCH_ITEM_TIMEOUT = 120.0
+
+async def _scrape_batch_item(index: int, item: Dict[str, Any], semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """Run one batch item on the shared browser pool and report its result, error and timings inline"""
+    url = item['url']
+    scraper_type = item['scraper_type']
+    queued_at = time.perf_counter()
+    
+    async with semaphore:
+        started_at = time.perf_counter()
+        result = {
+            "index": index,
+            "url": url,
+            "scraper_type": scraper_type,
+            "queued_seconds": round(started_at - queued_at, 3)
+        }
+        try:
+            scraper_instance = ScraperFactory.create_scraper(scraper_type, ScraperMode.SINGLE)
+            data = await asyncio.wait_for(scraper_instance.scrape_single(url), timeout=BATCH_ITEM_TIMEOUT)
+            if data:
+                result.update({"status": "success", "data": data})
+            else:
+                result.update({"status": "error", "error": "Scraper returned no data"})
+        except asyncio.TimeoutError:
+            result.update({"status": "error", "error": f"Timed out after {BATCH_ITEM_TIMEOUT:.0f}s"})
+        except Exception as e:
+            logger.error(f"Batch item {index} failed for {url}: {e}")
+            result.update({"status": "error", "error": str(e)})
+        
+        result["elapsed_seconds"] = round(time.perf_counter() - started_at, 3)
+        return result
+
+@quart_app.route('/scrape-batch', methods=['POST'])
+async def scrape_batch():
+    """
+    Scrape many URLs on a bounded worker pool over the shared browser
+    Streams one NDJSON line per item as soon as it finishes, then a summary line
+    Body: {"items": [{"url": ..., "scraper_type": ...}], "concurrency": 4}
+      or: {"urls": [...], "scraper_type": "regatta_network"}
+    """
+    try:
+        data = await request.get_json()
+        if not data:
+            return jsonify({"error": "JSON body required"}), 400
+        
+        default_type = data.get('scraper_type', 'regatta_network')
+        raw_items = data.get('items') or [{'url': url} for url in data.get('urls', [])]
+        if not raw_items:
+            return jsonify({"error": "items or urls is required"}), 400
+        if len(raw_items) > MAX_BATCH_ITEMS:
+            return jsonify({"error": f"At most {MAX_BATCH_ITEMS} items per batch"}), 400
+        
+        available_scrapers = ScraperFactory.list_available_scrapers()
+        items = []
+        for raw in raw_items:
+            url = (raw.get('url') or '').strip() if isinstance(raw, dict) else ''
+            scraper_type = raw.get('scraper_type', default_type) if isinstance(raw, dict) else default_type
+            if not url:
+                return jsonify({"error": "Every item needs a url"}), 400
+            if scraper_type not in available_scrapers:
+                return jsonify({
+                    "error": f"Unknown scraper type: {scraper_type}",
+                    "available_scrapers": available_scrapers
+                }), 400
+            items.append({'url': url, 'scraper_type': scraper_type})
+        
+        try:
+            concurrency = int(data.get('concurrency', DEFAULT_BATCH_CONCURRENCY))
+        except (TypeError, ValueError):
+            return jsonify({"error": "concurrency must be an integer"}), 400
+        concurrency = max(1, min(concurrency, MAX_BATCH_CONCURRENCY))
+        
+        logger.info(f"Starting batch scrape of {len(items)} items with concurrency {concurrency}")
+        
+    except Exception as e:
+        logger.error(f"Error in scrape-batch route: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+    
+    async def generate():
+        batch_started = time.perf_counter()
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks = [asyncio.create_task(_scrape_batch_item(i, item, semaphore)) for i, item in enumerate(items)]
+        succeeded = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                if result['status'] == 'success':
+                    succeeded += 1
+                yield json.dumps(result, default=str) + "\n"
+            
+            yield json.dumps({
+                "summary": True,
+                "total": len(items),
+                "succeeded": succeeded,
+                "failed": len(items) - succeeded,
+                "concurrency": concurrency,
+                "elapsed_seconds": round(time.perf_counter() - batch_started, 3)
+            }) + "\n"
+            logger.info(f"Batch scrape finished: {succeeded}/{len(items)} succeeded")
+        finally:
+            # Client went away or the stream ended - don't leave scrapes running
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    response = Response(generate(), mimetype='application/x-ndjson')
+    # Large batches outlive the default 60s response timeout
+    response.timeout = None
+    return response
+
 @quart_app.route('/stop', methods=['POST'])
 async def stop_scraping():
     """Stop a scraping session"""
@@ -689,6 +976,88 @@ async def get_session_status(session_id):
         logger.error(f"Error getting session status: {e}")
         return jsonify({"error": "Internal server error"}), 500
     
+# Server-Sent Events viewers
+SSE_KEEPALIVE_INTERVAL = 15.0
+SSE_RETRY_MS = 3000
+
+def _sse_frame(event: str, payload: Any, seq: Optional[int] = None) -> str:
+    """Format one SSE message - cached payloads are already encoded JSON and are sent as-is"""
+    data = payload if isinstance(payload, str) else json.dumps(payload, separators=(',', ':'), default=str)
+    event_id = f"id: {seq}\n" if seq is not None else ""
+    return f"{event_id}event: {event}\ndata: {data}\n\n"
+
+@quart_app.route('/events/<session_id>', methods=['GET'])
+async def stream_session_events(session_id):
+    """
+    Read-only Server-Sent Events feed of a session's updates
+    Shares the encoded updates and coalescing outboxes used for socket.io rooms
+    Reconnects resume with Last-Event-ID: the latest snapshot is only resent if the client is behind
+    """
+    try:
+        if session_id not in session_manager.sessions:
+            return jsonify({"error": "Session not found"}), 404
+        
+        last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+        try:
+            last_seq = int(last_event_id) if last_event_id else 0
+        except ValueError:
+            last_seq = 0
+        
+        await session_manager.update_activity(session_id)
+        
+    except Exception as e:
+        logger.error(f"Error in events route: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+    
+    async def generate():
+        # Subscribe before reading the cache so nothing published in between is missed
+        outbox = session_manager.emitter.open_stream(session_id)
+        sent_seq = last_seq
+        logger.info(f"SSE viewer {outbox.sid} joined session {session_id} (last seq {last_seq})")
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            
+            cached, source = await session_manager.get_cached_update(session_id)
+            if cached and (source == "url" or cached.seq > sent_seq):
+                # Sequence numbers only mean something within this session, so URL fallbacks carry no id
+                snapshot_seq = cached.seq if source == "session" else None
+                yield _sse_frame('session_snapshot', cached.snapshot_for(session_id, source), snapshot_seq)
+                if snapshot_seq is not None:
+                    sent_seq = snapshot_seq
+            
+            while True:
+                update = await session_manager.emitter.next_update(outbox, SSE_KEEPALIVE_INTERVAL)
+                if update is None:
+                    if outbox.closed:
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                
+                _, event, entry = update
+                if entry['seq'] is not None:
+                    if entry['seq'] <= sent_seq:
+                        continue
+                    sent_seq = entry['seq']
+                yield _sse_frame(event, entry['payload'], entry['seq'])
+        finally:
+            session_manager.emitter.remove_client(outbox.sid)
+            logger.info(f"SSE viewer {outbox.sid} left session {session_id}")
+    
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.timeout = None
+    return response
+
+@quart_app.route('/clients', methods=['GET'])
+async def list_clients():
+    """Per-client outbound queue and lag metrics (for monitoring/debugging)"""
+    try:
+        return jsonify(session_manager.emitter.get_stats())
+    except Exception as e:
+        logger.error(f"Error listing clients: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
 @quart_app.route('/sessions', methods=['GET'])
 async def list_sessions():
     """List all active sessions (for monitoring/debugging)"""
@@ -709,6 +1078,7 @@ def connect(sid, environ):
 
 @sio.event
 def disconnect(sid):
+    session_manager.emitter.remove_client(sid)
     logger.info(f"[SOCKET] Client disconnected: {sid}")
 
 @sio.event
@@ -722,13 +1092,22 @@ async def join_session(sid, data):
         session_id = data.get('session_id')
         if session_id and session_id in session_manager.sessions:
             await sio.enter_room(sid, session_id)
+            session_manager.emitter.subscribe(sid, session_id)
             await session_manager.update_activity(session_id)
             logger.info(f"Client {sid} joined session {session_id}")
             
+            cached, source = await session_manager.get_cached_update(session_id)
+            
             await sio.emit('joined_session', {
                 'session_id': session_id,
-                'status': 'success'
+                'status': 'success',
+                'snapshot_seq': cached.seq if cached else None
             }, room=sid)
+            
+            # Push the latest result right away instead of waiting for the next scrape tick
+            if cached:
+                await sio.emit('session_snapshot', cached.snapshot_for(session_id, source), room=sid)
+                logger.info(f"Sent {source} snapshot #{cached.seq} to client {sid} for session {session_id}")
         else:
             await sio.emit('error', {'message': 'Invalid session_id'}, room=sid)
     except Exception as e:
@@ -742,6 +1121,7 @@ async def leave_session(sid, data):
         session_id = data.get('session_id')
         if session_id:
             await sio.leave_room(sid, session_id)
+            session_manager.emitter.unsubscribe(sid, session_id)
             logger.info(f"Client {sid} left session {session_id}")
             
             await sio.emit('left_session', {
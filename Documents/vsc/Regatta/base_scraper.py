@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 import asyncio
+import importlib
 import logging
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 from enum import Enum
@@ -50,6 +52,12 @@ class BaseScraper(ABC):
         self.socketio = None
         self.session_manager = None
         
+        # Shared browser pool (set by ScraperFactory when one is configured)
+        self.browser_pool = None
+        
+        # Shared PDF document store (set by ScraperFactory when one is configured)
+        self.document_store = None
+        
         # Stop event for graceful shutdown
         self.stop_event: Optional[asyncio.Event] = None
         
@@ -71,11 +79,49 @@ class BaseScraper(ABC):
         self.last_activity = datetime.now()
         self.status = ScraperStatus.RUNNING
     
+    @asynccontextmanager
+    async def browser_page(self, **context_kwargs):
+        """
+        Open a page in a fresh browser context
+        Uses the shared browser pool when available, otherwise launches a private browser
+        """
+        if self.browser_pool is not None:
+            context = await self.browser_pool.new_context(**context_kwargs)
+            try:
+                yield await context.new_page()
+            finally:
+                await context.close()
+            return
+        
+        from playwright.async_api import async_playwright
+        
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            try:
+                context = await browser.new_context(**context_kwargs)
+                yield await context.new_page()
+            finally:
+                await browser.close()
+    
     async def update_activity(self):
         """Update last activity timestamp"""
         self.last_activity = datetime.now()
         if self.session_manager and self.session_id:
             await self.session_manager.update_activity(self.session_id)
+
+    async def publish_update(self, event: str, payload: Dict[str, Any], cache: bool = True):
+        """
+        Hand an outgoing update to the session manager, which caches it for late joiners
+        and queues it for each connected client without blocking the scrape loop.
+        Falls back to emitting straight to the session room when no session manager is set
+        """
+        if self.session_manager and hasattr(self.session_manager, 'publish_update'):
+            try:
+                await self.session_manager.publish_update(self.session_id, event, payload, cache=cache)
+                return
+            except Exception as e:
+                logger.warning(f"Could not publish {event} for session {self.session_id}: {e}")
+        await self.socketio.emit(event, payload, room=self.session_id)
     
     async def emit_update(self, data: Dict[str, Any], status: str = "success"):
         """Emit scraper update to connected clients"""
@@ -85,15 +131,15 @@ class BaseScraper(ABC):
                 return
             
             await self.update_activity()
-            
-            await self.socketio.emit('scraper_update', {
+
+            await self.publish_update('scraper_update', {
                 'session_id': self.session_id,
                 'data': data,
                 'status': status,
                 'timestamp': datetime.now().isoformat(),
                 'source': self.scraper_type.value,
                 'scraper_mode': self.mode.value
-            }, room=self.session_id)
+            })
             
             self.total_operations += 1
             logger.info(f"Emitted update for session {self.session_id} ({self.scraper_type.value})")
@@ -111,14 +157,14 @@ class BaseScraper(ABC):
             self.error_count += 1
             self.status = ScraperStatus.ERROR
             
-            await self.socketio.emit('scraper_error', {
+            await self.publish_update('scraper_error', {
                 'session_id': self.session_id,
                 'error': error_message,
                 'error_type': error_type,
                 'timestamp': datetime.now().isoformat(),
                 'source': self.scraper_type.value,
                 'scraper_mode': self.mode.value
-            }, room=self.session_id)
+            }, cache=False)
             
             logger.error(f"Emitted error for session {self.session_id}: {error_message}")
             
@@ -250,25 +296,63 @@ class ScraperFactory:
     """Factory for creating scraper instances"""
     
     _scrapers = {}
+    _lazy_scrapers = {}
+    _browser_pool = None
+    _document_store = None
     
     @classmethod
     def register_scraper(cls, name: str, scraper_class):
         """Register a scraper class"""
         cls._scrapers[name] = scraper_class
+        cls._lazy_scrapers.pop(name, None)
     
     @classmethod
-    def create_scraper(cls, scraper_name: str, mode: ScraperMode = ScraperMode.SINGLE) -> BaseScraper:
-        """Create a scraper instance"""
+    def register_lazy(cls, name: str, module_name: str, class_name: str):
+        """Register a scraper by name - its module is only imported the first time it is used"""
+        if name not in cls._scrapers:
+            cls._lazy_scrapers[name] = (module_name, class_name)
+    
+    @classmethod
+    def load_scraper(cls, scraper_name: str):
+        """Get a scraper class, importing its module if it was registered lazily"""
+        if scraper_name not in cls._scrapers and scraper_name in cls._lazy_scrapers:
+            module_name, class_name = cls._lazy_scrapers[scraper_name]
+            module = importlib.import_module(module_name)
+            cls.register_scraper(scraper_name, getattr(module, class_name))
+        
         if scraper_name not in cls._scrapers:
             raise ValueError(f"Unknown scraper type: {scraper_name}")
-        
-        scraper_class = cls._scrapers[scraper_name]
-        return scraper_class(mode)
+        return cls._scrapers[scraper_name]
+    
+    @classmethod
+    def load_all(cls):
+        """Import every lazily registered scraper module now (e.g. during warm-up)"""
+        for name in list(cls._lazy_scrapers):
+            cls.load_scraper(name)
+    
+    @classmethod
+    def set_browser_pool(cls, browser_pool):
+        """Share a browser pool with every scraper created from now on"""
+        cls._browser_pool = browser_pool
+    
+    @classmethod
+    def set_document_store(cls, document_store):
+        """Share a document store with every scraper created from now on"""
+        cls._document_store = document_store
+    
+    @classmethod
+    def create_scraper(cls, scraper_name: str, mode: ScraperMode = ScraperMode.SINGLE) -> BaseScraper:
+        """Create a scraper instance"""
+        scraper_class = cls.load_scraper(scraper_name)
+        scraper = scraper_class(mode)
+        scraper.browser_pool = cls._browser_pool
+        scraper.document_store = cls._document_store
+        return scraper
     
     @classmethod
     def list_available_scrapers(cls) -> List[str]:
-        """List all registered scrapers"""
-        return list(cls._scrapers.keys())
+        """List all registered scrapers, including ones not imported yet"""
+        return list(cls._scrapers.keys()) + [name for name in cls._lazy_scrapers if name not in cls._scrapers]
 
 
 # Connection management utilities
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the logging pipeline
+Measures event-loop lag while scraper-style hot-path logging runs,
+first with the old synchronous FileHandler setup and then with logging_setup
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+
+from logging_setup import EventLoopLagMonitor, setup_logging, stop_logging
+
+# Simulated hot path: records per tick and ticks per run
+RECORDS_PER_TICK = 200
+TICKS = 100
+
+
+def configure_sync(log_file: str):
+    """The previous asgi_app setup - the file handler writes inline on the event loop"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.FileHandler(log_file)],
+        force=True
+    )
+
+
+def configure_queued(log_file: str):
+    """Queue-backed setup with hot-path sampling (stdout left out so both runs only write the file)"""
+    logging.getLogger().handlers = []
+    setup_logging(log_file, console=False)
+
+
+async def run_hot_path():
+    """Log like a scraper does on every parse/emit, yielding to the loop between ticks"""
+    hot_logger = logging.getLogger('regatta_network_scraper')
+    monitor = EventLoopLagMonitor(interval=0.01, window=10000)
+    monitor.start()
+    await asyncio.sleep(0.05)
+
+    for tick in range(TICKS):
+        for i in range(RECORDS_PER_TICK):
+            hot_logger.info(f"Found {i} results for division {tick}")
+        await asyncio.sleep(0)
+
+    await asyncio.sleep(0.05)
+    monitor.task.cancel()
+    return monitor.get_stats()
+
+
+def print_stats(label: str, stats: dict):
+    print(f"{label:<22} mean {stats['mean_ms']:7.2f} ms | p99 {stats['p99_ms']:7.2f} ms | max {stats['max_ms']:7.2f} ms")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_sync(os.path.join(tmp, 'sync.log'))
+        sync_stats = asyncio.run(run_hot_path())
+
+        configure_queued(os.path.join(tmp, 'queued.log'))
+        queued_stats = asyncio.run(run_hot_path())
+        stop_logging()
+
+    print(f"Event-loop lag with {RECORDS_PER_TICK * TICKS} hot-path records")
+    print("=" * 70)
+    print_stats("synchronous handlers", sync_stats)
+    print_stats("queued + sampled", queued_stats)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
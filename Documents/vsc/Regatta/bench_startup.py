@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark for asgi_app cold start
+- Import time of asgi_app in a fresh interpreter (and which heavy modules it pulls in)
+- First-request latency: time to a usable page with a cold browser vs a pre-warmed pool
+Pass a regattanetwork.com URL to also time a full first scrape through the factory
+"""
+
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+IMPORT_RUNS = 5
+
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import asgi_app
+elapsed = time.perf_counter() - started
+heavy = ['playwright', 'main_scraper', 'api_scraper', 'regatta_network_scraper']
+print(json.dumps({'seconds': elapsed, 'loaded': [m for m in heavy if m in sys.modules]}))
+"""
+
+
+def measure_import_time():
+    """Import asgi_app in fresh interpreters and report the median"""
+    here = Path(__file__).parent
+    samples = []
+    loaded = []
+    for _ in range(IMPORT_RUNS):
+        output = subprocess.run(
+            [sys.executable, '-c', IMPORT_PROBE],
+            cwd=here, capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        result = json.loads(output)
+        samples.append(result['seconds'])
+        loaded = result['loaded']
+    return statistics.median(samples), loaded
+
+
+async def time_first_page(prewarm: bool, url: str = None) -> float:
+    """Time from 'request arrives' to a loaded page (or a full scrape when url is given)"""
+    import asgi_app  # noqa: F401 - registers the scrapers lazily
+    from base_scraper import ScraperFactory, ScraperMode
+    from browser_pool import BrowserPool
+
+    pool = BrowserPool()
+    ScraperFactory.set_browser_pool(pool)
+    if prewarm:
+        ScraperFactory.load_all()
+        await pool.prewarm()
+
+    try:
+        started = time.perf_counter()
+        scraper = ScraperFactory.create_scraper('regatta_network', ScraperMode.SINGLE)
+        if url:
+            await scraper.scrape_single(url)
+        else:
+            async with scraper.browser_page(user_agent=scraper.headers['User-Agent']) as page:
+                await page.goto('about:blank')
+        return time.perf_counter() - started
+    finally:
+        await pool.close()
+
+
+def main():
+    url = sys.argv[1] if len(sys.argv) > 1 else None
+
+    import_seconds, loaded = measure_import_time()
+    print("asgi_app cold start")
+    print("=" * 50)
+    print(f"Import time (median of {IMPORT_RUNS}): {import_seconds * 1000:.0f} ms")
+    print(f"Heavy modules loaded at import: {', '.join(loaded) or 'none'}")
+
+    try:
+        cold = asyncio.run(time_first_page(prewarm=False, url=url))
+        warm = asyncio.run(time_first_page(prewarm=True, url=url))
+    except Exception as e:
+        print(f"First-request benchmark skipped (is Chromium installed? `playwright install chromium`): {e}")
+        return 0
+
+    label = "first scrape" if url else "first page"
+    print(f"Latency to {label}, cold browser: {cold * 1000:.0f} ms")
+    print(f"Latency to {label}, pre-warmed:   {warm * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+class BrowserPool:
+    """
+    Shared Chromium instance for all scrapers in the process
+    - Launched once (optionally at startup) instead of once per scrape
+    - Keeps one pre-opened context warm so the next scrape skips context setup
+    - Playwright is imported on first use to keep module import cheap
+    """
+
+    def __init__(self, headless: bool = True, user_agent: str = DEFAULT_USER_AGENT):
+        self.headless = headless
+        self.user_agent = user_agent
+        self.browser = None
+        self._playwright = None
+        self._warm_context = None
+        self._refill_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.ready = False
+        self.launch_seconds: Optional[float] = None
+        self.contexts_opened = 0
+        self.warm_hits = 0
+
+    async def start(self):
+        """Launch the browser if it is not already running"""
+        if self.browser and self.browser.is_connected():
+            return
+
+        async with self._lock:
+            if self.browser and self.browser.is_connected():
+                return
+
+            from playwright.async_api import async_playwright
+
+            started = time.perf_counter()
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            self.browser = await self._playwright.chromium.launch(headless=self.headless)
+            self._warm_context = None
+            self.launch_seconds = time.perf_counter() - started
+            logger.info(f"Shared browser launched in {self.launch_seconds:.2f}s")
+
+    async def prewarm(self):
+        """Launch the browser and pre-open a context so the first scrape starts immediately"""
+        await self.start()
+        await self._refill()
+        self.ready = True
+        logger.info("Browser pool is warm")
+
+    async def _refill(self):
+        """Open a spare context for the next caller"""
+        try:
+            if self._warm_context is None and self.browser and self.browser.is_connected():
+                self._warm_context = await self.browser.new_context(user_agent=self.user_agent)
+        except Exception as e:
+            logger.warning(f"Could not pre-open browser context: {e}")
+
+    async def new_context(self, **context_kwargs):
+        """
+        Get a fresh browser context - callers own it and must close it
+        The warm context is handed out when no custom options are requested
+        """
+        await self.start()
+        self.contexts_opened += 1
+
+        custom = {k: v for k, v in context_kwargs.items() if not (k == 'user_agent' and v == self.user_agent)}
+        if not custom and self._warm_context is not None:
+            context, self._warm_context = self._warm_context, None
+            self.warm_hits += 1
+            if self._refill_task is None or self._refill_task.done():
+                self._refill_task = asyncio.create_task(self._refill())
+            return context
+
+        context_kwargs.setdefault('user_agent', self.user_agent)
+        return await self.browser.new_context(**context_kwargs)
+
+    async def close(self):
+        """Close the browser and stop Playwright"""
+        try:
+            if self._warm_context is not None:
+                await self._warm_context.close()
+            if self.browser:
+                await self.browser.close()
+            if self._playwright:
+                await self._playwright.stop()
+        except Exception as e:
+            logger.warning(f"Error closing browser pool: {e}")
+        finally:
+            self.browser = None
+            self._playwright = None
+            self._warm_context = None
+            self.ready = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get browser pool statistics"""
+        return {
+            'running': bool(self.browser and self.browser.is_connected()),
+            'ready': self.ready,
+            'warm_context': self._warm_context is not None,
+            'launch_seconds': self.launch_seconds,
+            'contexts_opened': self.contexts_opened,
+            'warm_hits': self.warm_hits
+        }
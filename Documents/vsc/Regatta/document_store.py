@@ -0,0 +1,283 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+MAX_DOCUMENT_BYTES = 50 * 1024 * 1024
+
+
+def extract_pdf_text(path: str) -> Optional[str]:
+    """
+    Extract plain text from a PDF - runs in a worker process
+    Returns None when pypdf is not installed
+    """
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+
+    reader = PdfReader(path)
+    return "\n\n".join((page.extract_text() or "") for page in reader.pages)
+
+
+class DocumentStore:
+    """
+    Content-addressed cache for the NOR/SI/amendment PDFs linked from event pages
+    - Downloads through one pooled aiohttp session, revalidating with ETag/Last-Modified
+      so unchanged documents cost a 304 instead of a re-download
+    - Stores each distinct file once under its SHA-256, with extracted text alongside
+    - Extracts text in a process pool so PDF parsing never blocks the event loop
+    - Keeps a per-event manifest to report which documents changed between scrapes
+    """
+
+    def __init__(self, root: str = 'document_cache', max_connections: int = 8,
+                 text_workers: int = 2, request_timeout: float = 30.0):
+        self.root = Path(root)
+        self.objects_dir = self.root / 'objects'
+        self.index_path = self.root / 'index.json'
+        self.max_connections = max_connections
+        self.text_workers = text_workers
+        self.request_timeout = request_timeout
+
+        self._session = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._text_tasks: Dict[str, asyncio.Task] = {}
+        self._index: Optional[Dict[str, Any]] = None
+        self._index_lock = asyncio.Lock()
+        self._text_unavailable = False
+
+        # Stats
+        self.downloads = 0
+        self.not_modified = 0
+        self.bytes_downloaded = 0
+        self.fetch_errors = 0
+
+    # Storage layout
+
+    def object_path(self, sha256: str) -> Path:
+        """Path of a stored document - objects/ab/abcdef...pdf"""
+        return self.objects_dir / sha256[:2] / f"{sha256}.pdf"
+
+    def text_path(self, sha256: str) -> Path:
+        """Path of a stored document's extracted text"""
+        return self.objects_dir / sha256[:2] / f"{sha256}.txt"
+
+    def has_document(self, sha256: str) -> bool:
+        return self.object_path(sha256).exists()
+
+    def get_text(self, sha256: str) -> Optional[str]:
+        """Get extracted text for a stored document, if extraction has finished"""
+        path = self.text_path(sha256)
+        return path.read_text(encoding='utf-8') if path.exists() else None
+
+    def _write_atomic(self, path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def _load_index(self) -> Dict[str, Any]:
+        if self._index is None:
+            try:
+                self._index = json.loads(self.index_path.read_text(encoding='utf-8'))
+            except FileNotFoundError:
+                self._index = {}
+            except Exception as e:
+                logger.warning(f"Could not read document index, starting fresh: {e}")
+                self._index = {}
+            self._index.setdefault('urls', {})
+            self._index.setdefault('events', {})
+        return self._index
+
+    async def _save_index(self):
+        data = json.dumps(self._load_index(), indent=2).encode('utf-8')
+        await asyncio.get_running_loop().run_in_executor(None, self._write_atomic, self.index_path, data)
+
+    # Fetching
+
+    async def _get_session(self):
+        if self._session is None or self._session.closed:
+            import aiohttp
+
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+            )
+        return self._session
+
+    async def fetch(self, url: str) -> Dict[str, Any]:
+        """
+        Make sure the document at url is stored locally
+        Returns {'url', 'sha256', 'downloaded', 'size'} - downloaded is False on a 304
+        """
+        index = self._load_index()
+        entry = dict(index['urls'].get(url, {}))
+
+        headers = {}
+        if entry.get('sha256') and self.has_document(entry['sha256']):
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        session = await self._get_session()
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304:
+                self.not_modified += 1
+                entry['checked_at'] = datetime.now().isoformat()
+                index['urls'][url] = entry
+                self._schedule_text_extraction(entry['sha256'])
+                return {'url': url, 'sha256': entry['sha256'], 'downloaded': False, 'size': entry.get('size')}
+
+            response.raise_for_status()
+            if (response.content_length or 0) > MAX_DOCUMENT_BYTES:
+                raise ValueError(f"Document is larger than {MAX_DOCUMENT_BYTES} bytes")
+            body = await response.read()
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+
+        sha256 = hashlib.sha256(body).hexdigest()
+        if not self.has_document(sha256):
+            await asyncio.get_running_loop().run_in_executor(None, self._write_atomic, self.object_path(sha256), body)
+
+        self.downloads += 1
+        self.bytes_downloaded += len(body)
+        entry.update({
+            'sha256': sha256,
+            'etag': etag,
+            'last_modified': last_modified,
+            'size': len(body),
+            'checked_at': datetime.now().isoformat()
+        })
+        index['urls'][url] = entry
+        self._schedule_text_extraction(sha256)
+        return {'url': url, 'sha256': sha256, 'downloaded': True, 'size': len(body)}
+
+    # Text extraction
+
+    def _schedule_text_extraction(self, sha256: str):
+        """Extract text in the background unless it already exists or is in progress"""
+        if self._text_unavailable or sha256 in self._text_tasks or self.text_path(sha256).exists():
+            return
+        task = asyncio.create_task(self._extract_text(sha256))
+        self._text_tasks[sha256] = task
+        task.add_done_callback(lambda _: self._text_tasks.pop(sha256, None))
+
+    async def _extract_text(self, sha256: str):
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.text_workers)
+        try:
+            loop = asyncio.get_running_loop()
+            text = await loop.run_in_executor(self._process_pool, extract_pdf_text, str(self.object_path(sha256)))
+            if text is None:
+                self._text_unavailable = True
+                logger.warning("pypdf is not installed - PDF text extraction is disabled")
+                return
+            await loop.run_in_executor(None, self._write_atomic, self.text_path(sha256), text.encode('utf-8'))
+            logger.info(f"Extracted {len(text)} characters of text from document {sha256[:12]}")
+        except Exception as e:
+            logger.warning(f"Text extraction failed for document {sha256[:12]}: {e}")
+
+    async def wait_for_text(self):
+        """Wait for any in-progress text extraction"""
+        if self._text_tasks:
+            await asyncio.gather(*list(self._text_tasks.values()), return_exceptions=True)
+
+    # Change tracking
+
+    async def sync(self, event_key: str, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Fetch an event's documents and compare them with the previous scrape of the same event
+        Annotates each document dict with sha256 and document_status in place
+        Returns the change report: added / changed / removed / unchanged / errors
+        """
+        urls = list(dict.fromkeys(doc['url'] for doc in documents if doc.get('url')))
+        results = await asyncio.gather(*(self.fetch(url) for url in urls), return_exceptions=True)
+        fetched = {}
+        for url, result in zip(urls, results):
+            if isinstance(result, Exception):
+                self.fetch_errors += 1
+                logger.warning(f"Could not fetch document {url}: {result}")
+            else:
+                fetched[url] = result
+
+        async with self._index_lock:
+            index = self._load_index()
+            previous = index['events'].get(event_key, {}).get('documents', {})
+            current = {}
+            changes = {'added': [], 'changed': [], 'removed': [], 'unchanged': [], 'errors': []}
+
+            for doc in documents:
+                url = doc.get('url')
+                if not url:
+                    continue
+                summary = {'name': doc.get('name'), 'url': url}
+                if url not in fetched:
+                    doc['document_status'] = 'error'
+                    changes['errors'].append(summary)
+                    if url in previous:
+                        current[url] = previous[url]
+                    continue
+
+                sha256 = fetched[url]['sha256']
+                doc['sha256'] = sha256
+                current[url] = {'sha256': sha256, 'name': doc.get('name')}
+                if url not in previous:
+                    status = 'added'
+                elif previous[url]['sha256'] != sha256:
+                    status = 'changed'
+                else:
+                    status = 'unchanged'
+                doc['document_status'] = status
+                changes[status].append({**summary, 'sha256': sha256})
+
+            for url, old in previous.items():
+                if url not in current:
+                    changes['removed'].append({'name': old.get('name'), 'url': url, 'sha256': old['sha256']})
+
+            changes['has_changes'] = bool(changes['added'] or changes['changed'] or changes['removed'])
+            changes['synced_at'] = datetime.now().isoformat()
+            index['events'][event_key] = {'documents': current, 'changes': changes}
+            await self._save_index()
+
+        logger.info(
+            f"Documents for {event_key}: {len(changes['added'])} added, {len(changes['changed'])} changed, "
+            f"{len(changes['removed'])} removed, {len(changes['unchanged'])} unchanged"
+        )
+        return changes
+
+    def get_changes(self, event_key: str) -> Optional[Dict[str, Any]]:
+        """Get the change report from the most recent sync of an event"""
+        event = self._load_index()['events'].get(event_key)
+        return event['changes'] if event else None
+
+    async def close(self):
+        """Close the HTTP session and stop the text extraction workers"""
+        await self.wait_for_text()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False)
+            self._process_pool = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get document store statistics"""
+        index = self._load_index()
+        return {
+            'documents': len({entry['sha256'] for entry in index['urls'].values() if entry.get('sha256')}),
+            'urls': len(index['urls']),
+            'events': len(index['events']),
+            'downloads': self.downloads,
+            'not_modified': self.not_modified,
+            'bytes_downloaded': self.bytes_downloaded,
+            'fetch_errors': self.fetch_errors,
+            'text_extractions_pending': len(self._text_tasks),
+            'text_extraction_available': not self._text_unavailable
+        }
@@ -0,0 +1,243 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ClientOutbox:
+    """
+    Bounded outbound queue for a single socket.io connection or SSE stream
+    Holds at most one unsent update per (session, event) - newer updates replace older ones
+    """
+
+    def __init__(self, sid: str, max_pending: int, transport: str = 'socketio'):
+        self.sid = sid
+        self.max_pending = max_pending
+        self.transport = transport
+        self.closed = False
+        self.pending: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self.sessions: Set[str] = set()
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+        # Lag metrics
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.last_delivery_lag: Optional[float] = None
+        self.max_delivery_lag = 0.0
+        self.last_sent_seq: Dict[str, int] = {}
+
+    def put(self, session_id: str, event: str, payload: Any, seq: Optional[int] = None):
+        """Queue an update, replacing any unsent update for the same session and event"""
+        key = (session_id, event)
+        entry = {'payload': payload, 'seq': seq, 'enqueued_at': time.monotonic()}
+
+        if key in self.pending:
+            # Latest wins - keep the original enqueue time so lag shows how long the client has been behind
+            entry['enqueued_at'] = self.pending[key]['enqueued_at']
+            self.pending[key] = entry
+            self.coalesced += 1
+        else:
+            if len(self.pending) >= self.max_pending:
+                self.pending.popitem(last=False)
+                self.dropped += 1
+            self.pending[key] = entry
+
+        self.wakeup.set()
+
+    def mark_sent(self, session_id: str, entry: Dict[str, Any]):
+        """Record delivery of a queued entry"""
+        lag = time.monotonic() - entry['enqueued_at']
+        self.sent += 1
+        self.last_delivery_lag = lag
+        self.max_delivery_lag = max(self.max_delivery_lag, lag)
+        if entry['seq'] is not None:
+            self.last_sent_seq[session_id] = entry['seq']
+
+    def get_stats(self, latest_seq: Dict[str, int]) -> Dict[str, Any]:
+        """Get lag statistics for this client"""
+        now = time.monotonic()
+        oldest = min((e['enqueued_at'] for e in self.pending.values()), default=None)
+        return {
+            'transport': self.transport,
+            'sessions': sorted(self.sessions),
+            'pending': len(self.pending),
+            'oldest_pending_seconds': now - oldest if oldest is not None else 0.0,
+            'sent': self.sent,
+            'coalesced': self.coalesced,
+            'dropped': self.dropped,
+            'last_delivery_lag_seconds': self.last_delivery_lag,
+            'max_delivery_lag_seconds': self.max_delivery_lag,
+            'seq_behind': {
+                session_id: latest_seq.get(session_id, 0) - self.last_sent_seq.get(session_id, 0)
+                for session_id in self.sessions if session_id in latest_seq
+            }
+        }
+
+
+class EmissionManager:
+    """
+    Decouples scrape loops from client speed
+    - publish() never awaits the network; it only queues into per-client outboxes
+    - one writer task per connection drains its outbox when the transport has room
+    - slow clients get the newest snapshot, not a backlog of stale ones
+    """
+
+    def __init__(self, socketio_server, max_pending: int = 8, max_transport_backlog: int = 2,
+                 backlog_poll_interval: float = 0.05):
+        self.sio = socketio_server
+        self.max_pending = max_pending
+        self.max_transport_backlog = max_transport_backlog
+        self.backlog_poll_interval = backlog_poll_interval
+        self.clients: Dict[str, ClientOutbox] = {}
+        self.rooms: Dict[str, Set[str]] = {}
+        self.latest_seq: Dict[str, int] = {}
+        self._stream_count = 0
+
+    def subscribe(self, sid: str, session_id: str):
+        """Start delivering a session's updates to a client"""
+        outbox = self.clients.get(sid)
+        if outbox is None:
+            outbox = ClientOutbox(sid, self.max_pending)
+            outbox.task = asyncio.create_task(self._drain(outbox))
+            self.clients[sid] = outbox
+
+        outbox.sessions.add(session_id)
+        self.rooms.setdefault(session_id, set()).add(sid)
+
+    def open_stream(self, session_id: str) -> ClientOutbox:
+        """
+        Register a read-only Server-Sent Events viewer for a session
+        There is no writer task - the HTTP response drains the outbox with next_update()
+        """
+        self._stream_count += 1
+        outbox = ClientOutbox(f"sse-{self._stream_count}", self.max_pending, transport='sse')
+        outbox.sessions.add(session_id)
+        self.clients[outbox.sid] = outbox
+        self.rooms.setdefault(session_id, set()).add(outbox.sid)
+        return outbox
+
+    async def next_update(self, outbox: ClientOutbox, timeout: float) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Wait for the next queued update on a stream outbox
+        Returns (session_id, event, entry), or None on timeout or once the stream is closed
+        """
+        while not outbox.pending and not outbox.closed:
+            outbox.wakeup.clear()
+            try:
+                await asyncio.wait_for(outbox.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+        if outbox.closed:
+            return None
+
+        (session_id, event), entry = outbox.pending.popitem(last=False)
+        outbox.mark_sent(session_id, entry)
+        return session_id, event, entry
+
+    def unsubscribe(self, sid: str, session_id: str):
+        """Stop delivering a session's updates to a client"""
+        outbox = self.clients.get(sid)
+        if outbox:
+            outbox.sessions.discard(session_id)
+            for key in [k for k in outbox.pending if k[0] == session_id]:
+                del outbox.pending[key]
+            if not outbox.sessions:
+                self.remove_client(sid)
+
+        members = self.rooms.get(session_id)
+        if members is not None:
+            members.discard(sid)
+            if not members:
+                del self.rooms[session_id]
+
+    def remove_client(self, sid: str):
+        """Forget a disconnected client and stop its writer task"""
+        outbox = self.clients.pop(sid, None)
+        if not outbox:
+            return
+
+        for session_id in outbox.sessions:
+            members = self.rooms.get(session_id)
+            if members is not None:
+                members.discard(sid)
+                if not members:
+                    del self.rooms[session_id]
+
+        outbox.closed = True
+        outbox.wakeup.set()
+        if outbox.task and not outbox.task.done():
+            outbox.task.cancel()
+
+    def drop_session(self, session_id: str):
+        """Unsubscribe every client from a removed session"""
+        for sid in list(self.rooms.get(session_id, ())):
+            self.unsubscribe(sid, session_id)
+        self.latest_seq.pop(session_id, None)
+
+    def publish(self, session_id: str, event: str, payload: Any, seq: Optional[int] = None) -> int:
+        """
+        Queue an update for every client subscribed to a session
+        Returns the number of clients it was queued for
+        """
+        if seq is not None:
+            self.latest_seq[session_id] = seq
+
+        members = self.rooms.get(session_id, ())
+        for sid in members:
+            self.clients[sid].put(session_id, event, payload, seq)
+        return len(members)
+
+    def _transport_backlog(self, sid: str) -> int:
+        """Number of packets already waiting in the engine.io send queue for a client"""
+        try:
+            eio_sid = self.sio.manager.eio_sid_from_sid(sid, '/')
+            socket = self.sio.eio.sockets.get(eio_sid)
+            return socket.queue.qsize() if socket else 0
+        except Exception:
+            return 0
+
+    async def _drain(self, outbox: ClientOutbox):
+        """Writer task - sends queued updates to one client as fast as it can take them"""
+        try:
+            while True:
+                await outbox.wakeup.wait()
+                outbox.wakeup.clear()
+
+                while outbox.pending:
+                    # Backpressure: let newer updates coalesce while the transport is still busy
+                    while self._transport_backlog(outbox.sid) >= self.max_transport_backlog:
+                        await asyncio.sleep(self.backlog_poll_interval)
+                    if not outbox.pending:
+                        break
+
+                    (session_id, event), entry = outbox.pending.popitem(last=False)
+                    try:
+                        await self.sio.emit(event, entry['payload'], to=outbox.sid)
+                    except Exception as e:
+                        logger.warning(f"Failed to deliver {event} to client {outbox.sid}: {e}")
+                        continue
+
+                    outbox.mark_sent(session_id, entry)
+
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Writer task for client {outbox.sid} failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-client lag statistics"""
+        clients = {sid: outbox.get_stats(self.latest_seq) for sid, outbox in self.clients.items()}
+        return {
+            'clients': clients,
+            'total_clients': len(clients),
+            'sse_clients': sum(1 for c in clients.values() if c['transport'] == 'sse'),
+            'total_pending': sum(c['pending'] for c in clients.values()),
+            'total_coalesced': sum(c['coalesced'] for c in clients.values()),
+            'total_dropped': sum(c['dropped'] for c in clients.values())
+        }
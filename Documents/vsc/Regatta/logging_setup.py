@@ -0,0 +1,168 @@
+import asyncio
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Per-subsystem levels, overridable with REGATTA_LOG_LEVELS="engineio=INFO,regatta_network_scraper=DEBUG"
+DEFAULT_LEVELS = {
+    'socketio': 'WARNING',
+    'engineio': 'WARNING',
+    'asyncio': 'WARNING',
+}
+
+# Loggers whose INFO/DEBUG chatter runs on every emit/parse - only 1 in N records per call site is kept
+DEFAULT_SAMPLE_RATES = {
+    'base_scraper': 10,
+    'regatta_network_scraper': 10,
+    'main_scraper': 10,
+    'api_scraper': 10,
+}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class HotPathSampler(logging.Filter):
+    """
+    Keeps 1 in N INFO/DEBUG records per call site for the configured loggers
+    Warnings and errors always pass; kept records note how many were skipped
+    """
+
+    def __init__(self, sample_rates: Dict[str, int]):
+        super().__init__()
+        self.sample_rates = {name: rate for name, rate in sample_rates.items() if rate > 1}
+        self.counters: Dict[tuple, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        rate = self.sample_rates.get(record.name)
+        if not rate:
+            return True
+
+        key = (record.pathname, record.lineno)
+        count = self.counters.get(key, 0)
+        self.counters[key] = count + 1
+        if count % rate:
+            return False
+
+        if count:
+            record.msg = f"{record.getMessage()} [sampled 1/{rate}]"
+            record.args = None
+        return True
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """Parse 'name=LEVEL,name=LEVEL' into a dict"""
+    levels = {}
+    for item in spec.split(','):
+        if '=' in item:
+            name, level = item.split('=', 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(log_file: str = 'regatta_scraper.log', level: int = logging.INFO,
+                  levels: Optional[Dict[str, str]] = None,
+                  sample_rates: Optional[Dict[str, int]] = None,
+                  console: bool = True) -> logging.handlers.QueueListener:
+    """
+    Route all logging through a queue so formatting and disk/stdout writes
+    happen on a background thread instead of the event loop
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.FileHandler(log_file)]
+    if console:
+        handlers.append(logging.StreamHandler(sys.stdout))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(HotPathSampler(sample_rates if sample_rates is not None else DEFAULT_SAMPLE_RATES))
+
+    # Skip LogRecord fields nothing here formats - makes every record cheaper to create
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level)
+
+    configured = dict(DEFAULT_LEVELS)
+    configured.update(parse_levels(os.environ.get('REGATTA_LOG_LEVELS', '')))
+    configured.update(levels or {})
+    for name, name_level in configured.items():
+        logging.getLogger(name).setLevel(name_level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """Flush queued records and stop the background writer"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class EventLoopLagMonitor:
+    """
+    Measures how late the event loop wakes up compared to when it was asked to
+    Lag here is time the loop spent blocked on something synchronous
+    """
+
+    def __init__(self, interval: float = 0.5, window: int = 240):
+        self.interval = interval
+        self.window = window
+        self.samples: list = []
+        self.max_lag = 0.0
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start sampling on the running loop"""
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        try:
+            while True:
+                expected = time.perf_counter() + self.interval
+                await asyncio.sleep(self.interval)
+                lag = max(0.0, time.perf_counter() - expected)
+                self.samples.append(lag)
+                if len(self.samples) > self.window:
+                    self.samples.pop(0)
+                self.max_lag = max(self.max_lag, lag)
+        except asyncio.CancelledError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get lag statistics in milliseconds over the recent window"""
+        if not self.samples:
+            return {'samples': 0}
+        ordered = sorted(self.samples)
+        return {
+            'samples': len(ordered),
+            'mean_ms': sum(ordered) / len(ordered) * 1000,
+            'p99_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+            'max_recent_ms': ordered[-1] * 1000,
+            'max_ms': self.max_lag * 1000
+        }
@@ -1,8 +1,7 @@
-from playwright.async_api import async_playwright
 import asyncio
 import logging
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any
 import re
 from urllib.parse import urljoin, urlparse
 from base_scraper import BaseScraper, ScraperType, ScraperMode, ScraperFactory
@@ -25,6 +24,9 @@ class ClubSpotMainScraper(BaseScraper):
         # Performance optimization flags
         self._browser_reuse = False  # For future live mode optimization
         
+        # Background PDF syncs by event URL (see _start_document_sync)
+        self._document_syncs: Dict[str, asyncio.Task] = {}
+        
     async def discover(self, url: str) -> bool:
         """
         Discovery phase - validate that this is a valid ClubSpot event page
@@ -40,18 +42,13 @@ class ClubSpotMainScraper(BaseScraper):
                 return False
             
             # Quick page check
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page()
-                
+            async with self.browser_page() as page:
                 try:
                     await page.goto(url, wait_until='domcontentloaded', timeout=10000)
                     
                     # Check for ClubSpot-specific elements
                     event_page_indicator = await page.query_selector('.event-page-name, .event-card-image-inner-contain, .eventDateInsert')
                     
-                    await browser.close()
-                    
                     if event_page_indicator:
                         logger.info(f"Successfully discovered ClubSpot event page: {url}")
                         return True
@@ -60,7 +57,6 @@ class ClubSpotMainScraper(BaseScraper):
                         return False
                         
                 except Exception as e:
-                    await browser.close()
                     logger.error(f"Error during discovery: {e}")
                     return False
                     
@@ -77,10 +73,7 @@ class ClubSpotMainScraper(BaseScraper):
             await self.update_activity()
             logger.info(f"Starting single scrape for URL: {url}")
             
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page()
-                
+            async with self.browser_page() as page:
                 # Set headers for better compatibility
                 await page.set_extra_http_headers(self.headers)
                 
@@ -91,23 +84,58 @@ class ClubSpotMainScraper(BaseScraper):
                     # Extract event information
                     event_info = await self._extract_event_info(page)
                     
-                    # Format the data
-                    formatted_data = self._format_event_data(event_info, url)
-                    
-                    logger.info(f"Successfully scraped event info for: {url}")
-                    return formatted_data
-                    
                 except Exception as e:
                     logger.error(f"Error during page scraping: {e}")
                     raise e
-                finally:
-                    await browser.close()
+            
+            # Cache the PDFs and detect amendments in the background - the scrape result doesn't wait
+            # on the downloads; the change report is published as document_changes when it is ready
+            if self.document_store is not None and event_info.get('pdf_documents'):
+                self._start_document_sync(url, event_info['pdf_documents'])
+            
+            # Format the data
+            formatted_data = self._format_event_data(event_info, url)
+            
+            logger.info(f"Successfully scraped event info for: {url}")
+            return formatted_data
                     
         except Exception as e:
             logger.error(f"Error in single scrape: {e}")
             await self.emit_error(f"Failed to scrape event info: {str(e)}", "scraping")
             raise e
     
+    def _start_document_sync(self, url: str, documents: list):
+        """Sync an event's PDFs with the document store on a background task (one per event URL)"""
+        running = self._document_syncs.get(url)
+        if running is not None and not running.done():
+            # The previous scrape's sync is still fetching this event's documents
+            return
+        # Copies - sync annotates documents in place and the scrape result is already on its way out
+        self._document_syncs[url] = asyncio.create_task(self._sync_documents(url, [dict(doc) for doc in documents]))
+    
+    async def _sync_documents(self, url: str, documents: list):
+        """Run a document sync and publish its change report to the session"""
+        try:
+            changes = await self.document_store.sync(url, documents)
+        except Exception as e:
+            logger.warning(f"Document sync failed for {url}: {e}")
+            return
+        
+        if not self.socketio or not self.session_id:
+            # No session to notify (e.g. scrape_event_info_direct) - the report is served by /documents/changes
+            return
+        try:
+            await self.publish_update('document_changes', {
+                'session_id': self.session_id,
+                'url': url,
+                'document_changes': changes,
+                'pdf_documents': documents,
+                'timestamp': datetime.now().isoformat(),
+                'source': self.scraper_type.value
+            }, cache=False)
+        except Exception as e:
+            logger.warning(f"Could not publish document changes for {url}: {e}")
+    
     async def scrape_live(self, url: str, update_interval: float = 30.0):
         """
         Live scraping operation - continuous monitoring of event page
@@ -307,28 +335,40 @@ class ClubSpotMainScraper(BaseScraper):
     
     async def _extract_pdf_documents(self, page) -> list:
         """
-        Extract PDF document URLs - optimized version
-        Uses window.open override to capture PDF URLs when documents are clicked
+        Extract PDF document URLs in a single in-page pass
+        Reads every row's name, date and documentRow_<id>, fires all view clicks against
+        a window.open override, waits once for late opens (matched to rows by document id only), then falls back per row to
+        in-page document data and the CloudFront URL pattern
         """
         try:
-            pdf_documents = []
-            document_rows = await page.query_selector_all('.documentRow')
-            
-            if not document_rows:
-                logger.info("No document rows found")
-                return []
-            
-            logger.info(f"Found {len(document_rows)} document rows")
-            
-            # Set up window.open override to capture URLs
-            await page.evaluate("""
-                () => {
-                    window._originalOpen = window.open;
-                    window._capturedUrls = [];
+            pdf_documents = await page.evaluate("""
+                async (settleMs) => {
+                    const rows = Array.from(document.querySelectorAll('.documentRow'));
+                    if (!rows.length) {
+                        return [];
+                    }
+                    
+                    const text = (el) => (el && el.textContent ? el.textContent.trim() : null);
+                    const docs = rows.map((row, i) => {
+                        const match = (row.className || '').match(/documentRow_([A-Za-z0-9]+)/);
+                        return {
+                            name: text(row.querySelector('td:first-child p')) || `Document ${i + 1}`,
+                            upload_date: text(row.querySelector('td:last-child p')),
+                            document_id: match ? match[1] : null,
+                            url: null
+                        };
+                    });
                     
-                    window.open = function(url, target, features) {
-                        console.log('Captured PDF URL:', url);
-                        window._capturedUrls.push(url);
+                    // Capture window.open - synchronous opens are attributed to the row being clicked
+                    const originalOpen = window.open;
+                    const lateUrls = [];
+                    let currentRow = null;
+                    window.open = function(url) {
+                        if (currentRow !== null && !docs[currentRow].url) {
+                            docs[currentRow].url = url;
+                        } else {
+                            lateUrls.push(url);
+                        }
                         return {
                             close: () => {},
                             focus: () => {},
@@ -336,56 +376,66 @@ class ClubSpotMainScraper(BaseScraper):
                             document: { title: 'Document' }
                         };
                     };
-                }
-            """)
-            
-            # Process each document row with improved error handling
-            for i, row in enumerate(document_rows):
-                try:
-                    # Extract document metadata
-                    doc_info = await self._extract_document_info(row, i)
-                    
-                    # Get URLs before clicking
-                    urls_before = await page.evaluate("() => window._capturedUrls.length")
                     
-                    # Try to trigger URL capture
-                    await self._trigger_document_click(row, doc_info['name'])
-                    
-                    # Wait for potential async operations
-                    await page.wait_for_timeout(300)
-                    
-                    # Check for captured URL
-                    pdf_url = await self._get_captured_url(page, urls_before, doc_info['name'])
-                    
-                    # If no URL captured, try alternative methods
-                    if not pdf_url:
-                        pdf_url = await self._try_alternative_url_extraction(page, row, doc_info['name'])
-                    
-                    doc_info['url'] = pdf_url
-                    pdf_documents.append(doc_info)
+                    try {
+                        rows.forEach((row, i) => {
+                            const button = Array.from(row.querySelectorAll('button'))
+                                .find(b => /view document/i.test(b.textContent || ''));
+                            currentRow = i;
+                            try {
+                                (button || row).click();
+                            } catch (e) {
+                                // Row stays unresolved and falls through to the fallbacks below
+                            }
+                        });
+                        currentRow = null;
+                        
+                        // One shared wait for handlers that open the document asynchronously
+                        if (docs.some(d => !d.url)) {
+                            await new Promise(resolve => setTimeout(resolve, settleMs));
+                        }
+                    } finally {
+                        window.open = originalOpen;
+                    }
                     
-                    logger.info(f"Document processed: {doc_info['name']} -> {pdf_url or 'No URL'}")
+                    // Late opens complete in arbitrary order - only attribute a URL that names the
+                    // row's document id; anything else is left to the fallbacks below
+                    for (const url of lateUrls) {
+                        const doc = docs.find(d => !d.url && d.document_id && String(url).includes(d.document_id));
+                        if (doc) {
+                            doc.url = url;
+                        }
+                    }
                     
-                except Exception as row_error:
-                    logger.error(f"Error processing document row {i}: {row_error}")
-                    # Add document with error info
-                    pdf_documents.append({
-                        'name': f"Document {i+1}",
-                        'upload_date': None,
-                        'url': None,
-                        'error': str(row_error)
-                    })
-            
-            # Restore original window.open
-            await page.evaluate("""
-                () => {
-                    if (window._originalOpen) {
-                        window.open = window._originalOpen;
-                        delete window._originalOpen;
-                        delete window._capturedUrls;
+                    // Fallbacks: document data exposed on the page, then the ClubSpot CloudFront pattern
+                    const sources = [window.documents, window.documentData, window.fileData];
+                    for (const doc of docs) {
+                        if (doc.url || !doc.document_id) {
+                            continue;
+                        }
+                        for (const source of sources) {
+                            const docObj = source && source[doc.document_id];
+                            if (docObj && typeof docObj.get === 'function' && docObj.get('URL')) {
+                                doc.url = docObj.get('URL');
+                            } else if (docObj && (docObj.URL || docObj.url)) {
+                                doc.url = docObj.URL || docObj.url;
+                            }
+                            if (doc.url) {
+                                break;
+                            }
+                        }
+                        if (!doc.url) {
+                            doc.url = 'https://d282wvk2qi4wzk.cloudfront.net/' + doc.document_id + '.pdf';
+                        }
                     }
+                    
+                    return docs;
                 }
-            """)
+            """, 300)
+            
+            if not pdf_documents:
+                logger.info("No document rows found")
+                return []
             
             successful_extractions = len([doc for doc in pdf_documents if doc.get('url')])
             logger.info(f"Extracted {successful_extractions}/{len(pdf_documents)} PDF URLs")
@@ -395,119 +445,6 @@ class ClubSpotMainScraper(BaseScraper):
             logger.error(f"Error in _extract_pdf_documents: {e}")
             return []
     
-    async def _extract_document_info(self, row, index: int) -> Dict[str, Any]:
-        """Extract basic document information from row"""
-        try:
-            # Document name
-            name_element = await row.query_selector('td:first-child p')
-            doc_name = await name_element.text_content() if name_element else f"Document {index+1}"
-            
-            # Upload date
-            date_element = await row.query_selector('td:last-child p')
-            upload_date = await date_element.text_content() if date_element else None
-            
-            return {
-                'name': doc_name.strip(),
-                'upload_date': upload_date.strip() if upload_date else None
-            }
-        except Exception as e:
-            logger.warning(f"Error extracting document info: {e}")
-            return {
-                'name': f"Document {index+1}",
-                'upload_date': None
-            }
-    
-    async def _trigger_document_click(self, row, doc_name: str):
-        """Try different methods to trigger document URL capture"""
-        try:
-            # Method 1: Click the view button
-            view_button = await row.query_selector('button:has-text("view document")')
-            if view_button:
-                await view_button.click()
-                return
-        except Exception:
-            pass
-        
-        try:
-            # Method 2: Click the row itself
-            await row.click()
-        except Exception as e:
-            logger.warning(f"Failed to click document row for {doc_name}: {e}")
-    
-    async def _get_captured_url(self, page, urls_before: int, doc_name: str) -> Optional[str]:
-        """Check if a new URL was captured"""
-        try:
-            captured_info = await page.evaluate("""
-                (urlsBefore) => {
-                    const currentUrls = window._capturedUrls;
-                    if (currentUrls.length > urlsBefore) {
-                        return currentUrls[currentUrls.length - 1];
-                    }
-                    return null;
-                }
-            """, urls_before)
-            
-            if captured_info:
-                logger.info(f"Successfully captured URL for {doc_name}")
-                return captured_info
-            
-            return None
-            
-        except Exception as e:
-            logger.warning(f"Error getting captured URL for {doc_name}: {e}")
-            return None
-    
-    async def _try_alternative_url_extraction(self, page, row, doc_name: str) -> Optional[str]:
-        """Try alternative methods to extract PDF URL"""
-        try:
-            # Try to get document ID from row class
-            row_class = await row.get_attribute('class')
-            doc_id = None
-            
-            if row_class:
-                match = re.search(r'documentRow_([A-Za-z0-9]+)', row_class)
-                if match:
-                    doc_id = match.group(1)
-            
-            if doc_id:
-                # Try direct URL construction based on common patterns
-                alternative_url = await page.evaluate("""
-                    (docId) => {
-                        try {
-                            // Check for document data in common locations
-                            const sources = [window.documents, window.documentData, window.fileData];
-                            
-                            for (let source of sources) {
-                                if (source && source[docId]) {
-                                    const docObj = source[docId];
-                                    if (docObj && typeof docObj.get === 'function') {
-                                        return docObj.get('URL');
-                                    }
-                                    if (docObj && (docObj.URL || docObj.url)) {
-                                        return docObj.URL || docObj.url;
-                                    }
-                                }
-                            }
-                            
-                            // Try CloudFront pattern (common for ClubSpot)
-                            return 'https://d282wvk2qi4wzk.cloudfront.net/' + docId + '.pdf';
-                            
-                        } catch (error) {
-                            return null;
-                        }
-                    }
-                """, doc_id)
-                
-                if alternative_url:
-                    logger.info(f"Alternative URL extraction successful for {doc_name}")
-                    return alternative_url
-            
-            return None
-            
-        except Exception as e:
-            logger.warning(f"Alternative URL extraction failed for {doc_name}: {e}")
-            return None
-    
     def _format_event_data(self, event_info: Dict[str, Any], original_url: str) -> Dict[str, Any]:
         """Format event data for client consumption"""
         return {
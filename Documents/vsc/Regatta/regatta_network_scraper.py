@@ -1,9 +1,8 @@
-from playwright.async_api import async_playwright
 import asyncio
 import logging
 import re
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, AsyncIterator, Tuple
 from urllib.parse import urlparse, urljoin
 
 from base_scraper import BaseScraper, ScraperType, ScraperMode, ScraperFactory, ScraperStatus
@@ -37,29 +36,19 @@ class RegattaNetworkScraper(BaseScraper):
                 else:
                     url += "?media_format=1"
             
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context(
-                    user_agent=self.headers['User-Agent']
-                )
-                page = await context.new_page()
+            async with self.browser_page(user_agent=self.headers['User-Agent']) as page:
+                await page.goto(url, timeout=self.page_load_timeout)
                 
-                try:
-                    await page.goto(url, timeout=self.page_load_timeout)
-                    
-                    # Check if this is a valid regatta results page
-                    title_element = await page.query_selector("h4")
-                    if title_element:
-                        title_text = await title_element.text_content()
-                        if title_text and any(keyword in title_text.upper() for keyword in ["SERIES", "REGATTA", "CHAMPIONSHIP"]):
-                            logger.info(f"Successfully discovered regatta page: {title_text.strip()}")
-                            return True
-                    
-                    logger.warning("Page doesn't appear to be a valid regatta results page")
-                    return False
-                    
-                finally:
-                    await browser.close()
+                # Check if this is a valid regatta results page
+                title_element = await page.query_selector("h4")
+                if title_element:
+                    title_text = await title_element.text_content()
+                    if title_text and any(keyword in title_text.upper() for keyword in ["SERIES", "REGATTA", "CHAMPIONSHIP"]):
+                        logger.info(f"Successfully discovered regatta page: {title_text.strip()}")
+                        return True
+                
+                logger.warning("Page doesn't appear to be a valid regatta results page")
+                return False
                     
         except Exception as e:
             logger.error(f"Discovery failed for {url}: {e}")
@@ -70,52 +59,63 @@ class RegattaNetworkScraper(BaseScraper):
         Single scrape operation - extract regatta data once
         """
         try:
-            # Ensure URL has media_format=1 parameter
-            if "media_format=1" not in url:
-                if "?" in url:
-                    url += "&media_format=1"
-                else:
-                    url += "?media_format=1"
+            result = {"event_info": None, "divisions": [], "metadata": {}}
             
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context(
-                    user_agent=self.headers['User-Agent']
-                )
-                page = await context.new_page()
-                
-                try:
-                    await page.goto(url, timeout=self.page_load_timeout)
-                    await page.wait_for_load_state('networkidle', timeout=10000)
-                    
-                    # Extract all data
-                    event_info = await self.extract_event_info(page)
-                    divisions = await self.extract_divisions(page, url)
-                    
-                    result = {
-                        "event_info": event_info,
-                        "divisions": divisions,
-                        "metadata": {
-                            "scraped_at": datetime.now().isoformat(),
-                            "source_url": url,
-                            "total_divisions": len(divisions),
-                            "scraper_type": "regatta_network"
-                        }
-                    }
-                    
-                    # Cache results for comparison in live mode
-                    self.last_results = result.copy()
-                    
-                    return result
-                    
-                finally:
-                    await browser.close()
+            async for part, payload in self.stream_single(url):
+                if part == "event_info":
+                    result["event_info"] = payload
+                elif part == "division":
+                    result["divisions"].append(payload)
+                elif part == "complete":
+                    result["metadata"] = payload
+            
+            return result
                     
         except Exception as e:
             logger.error(f"Error in single scrape: {e}")
             await self.emit_error(f"Scraping failed: {str(e)}", "scraping")
             raise e
     
+    async def stream_single(self, url: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Progressive single scrape - yields results as soon as each part is extracted:
+        ("event_info", {...}) first, then ("division", {...}) per division, then ("complete", metadata)
+        """
+        # Ensure URL has media_format=1 parameter
+        if "media_format=1" not in url:
+            if "?" in url:
+                url += "&media_format=1"
+            else:
+                url += "?media_format=1"
+        
+        async with self.browser_page(user_agent=self.headers['User-Agent']) as page:
+            await page.goto(url, timeout=self.page_load_timeout)
+            await page.wait_for_load_state('networkidle', timeout=10000)
+            
+            event_info = await self.extract_event_info(page)
+            yield "event_info", event_info
+            
+            divisions = []
+            async for division in self.iter_divisions(page, url):
+                divisions.append(division)
+                yield "division", division
+            
+            metadata = {
+                "scraped_at": datetime.now().isoformat(),
+                "source_url": url,
+                "total_divisions": len(divisions),
+                "scraper_type": "regatta_network"
+            }
+            
+            # Cache results for comparison in live mode
+            self.last_results = {
+                "event_info": event_info,
+                "divisions": divisions,
+                "metadata": metadata
+            }
+            
+            yield "complete", metadata
+    
     async def extract_event_info(self, page) -> Dict[str, Any]:
         """Extract event information from the page header"""
         event_info: dict[str, Optional[str]] = {
@@ -171,27 +171,27 @@ class RegattaNetworkScraper(BaseScraper):
     
     async def extract_divisions(self, page, base_url: str) -> List[Dict[str, Any]]:
         """Extract all racing divisions and their results"""
-        divisions = []
-        
+        divisions = [division async for division in self.iter_divisions(page, base_url)]
+        logger.info(f"Extracted {len(divisions)} divisions")
+        return divisions
+    
+    async def iter_divisions(self, page, base_url: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield racing divisions one at a time as each finishes extracting"""
         try:
             # Find all division headers (h2 elements with division names)
             division_headers = await page.query_selector_all("h2")
-            
-            for header in division_headers:
-                try:
-                    division_data = await self.extract_single_division(page, header, base_url)
-                    if division_data:
-                        divisions.append(division_data)
-                except Exception as e:
-                    logger.warning(f"Error extracting division: {e}")
-                    continue
-            
-            logger.info(f"Extracted {len(divisions)} divisions")
-            
         except Exception as e:
             logger.error(f"Error extracting divisions: {e}")
+            return
         
-        return divisions
+        for header in division_headers:
+            try:
+                division_data = await self.extract_single_division(page, header, base_url)
+            except Exception as e:
+                logger.warning(f"Error extracting division: {e}")
+                continue
+            if division_data:
+                yield division_data
     
     async def extract_single_division(self, page, header_element, base_url: str) -> Optional[Dict[str, Any]]:
         """Extract a single division's data"""
@@ -553,8 +553,8 @@ class RegattaNetworkScraper(BaseScraper):
             
             logger.info(f"Emitting regatta_network_update for session {self.session_id} with {len(data.get('divisions', []))} divisions")
             
-            # Emit the enhanced data directly (not wrapped in another object)
-            await self.socketio.emit('regatta_network_update', enhanced_data, room=self.session_id)
+            # Publish the enhanced data directly (not wrapped in another object)
+            await self.publish_update('regatta_network_update', enhanced_data)
             
             self.total_operations += 1
             logger.info(f"Successfully emitted regatta network update for session {self.session_id}")
@@ -563,11 +563,11 @@ class RegattaNetworkScraper(BaseScraper):
             logger.error(f"Error emitting regatta network update: {e}")
             if self.socketio and self.session_id:
                 try:
-                    await self.socketio.emit('regatta_network_error', {
+                    await self.publish_update('regatta_network_error', {
                         'session_id': self.session_id,
                         'error': str(e),
                         'timestamp': datetime.now().isoformat()
-                    }, room=self.session_id)
+                    }, cache=False)
                 except Exception as emit_error:
                     logger.error(f"Failed to emit error event: {emit_error}")
 
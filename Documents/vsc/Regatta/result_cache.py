@@ -0,0 +1,128 @@
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class EncodedPayload(str):
+    """
+    JSON text that has already been serialized once
+    Reused verbatim for every recipient instead of being re-encoded per emit
+    """
+
+    @classmethod
+    def encode(cls, data: Any) -> 'EncodedPayload':
+        """Serialize data once into compact JSON"""
+        return cls(json.dumps(data, separators=(',', ':'), default=str))
+
+
+class PreEncodedJSON:
+    """
+    Drop-in json module for socketio.AsyncServer
+    Splices EncodedPayload arguments into outgoing packets as-is
+    so cached updates are never serialized twice
+    """
+
+    @staticmethod
+    def dumps(obj, **kwargs) -> str:
+        if isinstance(obj, list) and any(isinstance(item, EncodedPayload) for item in obj):
+            parts = [
+                item if isinstance(item, EncodedPayload) else json.dumps(item, **kwargs)
+                for item in obj
+            ]
+            return '[' + ','.join(parts) + ']'
+        return json.dumps(obj, **kwargs)
+
+    @staticmethod
+    def loads(s, **kwargs):
+        return json.loads(s, **kwargs)
+
+
+class CachedUpdate:
+    """Latest encoded update emitted for a session"""
+
+    def __init__(self, session_id: str, event: str, payload: EncodedPayload, seq: int):
+        self.session_id = session_id
+        self.event = event
+        self.payload = payload
+        self.seq = seq
+        self.cached_at = datetime.now()
+
+    def snapshot_for(self, session_id: str, source: str = "session") -> EncodedPayload:
+        """
+        Wrap the cached payload in a session_snapshot envelope
+        The payload itself is spliced in without being decoded or re-encoded
+        """
+        header = json.dumps({
+            'session_id': session_id,
+            'seq': self.seq,
+            'event': self.event,
+            'source': source,
+            'cached_at': self.cached_at.isoformat()
+        }, separators=(',', ':'))
+        return EncodedPayload(header[:-1] + ',"data":' + self.payload + '}')
+
+
+class LatestResultCache:
+    """
+    Holds the latest encoded update per session and per scraped URL
+    - Session entries serve viewers joining a running session
+    - URL entries let a new session on an already-scraped URL show data before its first tick
+    """
+
+    def __init__(self):
+        self._by_session: Dict[str, CachedUpdate] = {}
+        self._by_url: Dict[Tuple[str, str], CachedUpdate] = {}
+        self._sequences: Dict[str, int] = {}
+
+    def next_sequence(self, session_id: str) -> int:
+        """Get the next update sequence number for a session"""
+        seq = self._sequences.get(session_id, 0) + 1
+        self._sequences[session_id] = seq
+        return seq
+
+    def store(self, session_id: str, event: str, data: Dict[str, Any],
+              url_key: Optional[Tuple[str, str]] = None) -> CachedUpdate:
+        """
+        Stamp data with the next sequence number, encode it once and cache it
+        Returns the cached update so callers can emit the same encoded payload
+        """
+        seq = self.next_sequence(session_id)
+        data['seq'] = seq
+        cached = CachedUpdate(session_id, event, EncodedPayload.encode(data), seq)
+
+        self._by_session[session_id] = cached
+        if url_key:
+            self._by_url[url_key] = cached
+
+        logger.debug(f"Cached {event} #{seq} for session {session_id} ({len(cached.payload)} bytes)")
+        return cached
+
+    def get(self, session_id: str, url_key: Optional[Tuple[str, str]] = None) -> Tuple[Optional[CachedUpdate], Optional[str]]:
+        """
+        Get the latest update for a session, falling back to the latest result for its URL
+        Returns (cached_update, source) where source is 'session' or 'url'
+        """
+        cached = self._by_session.get(session_id)
+        if cached:
+            return cached, "session"
+        if url_key and url_key in self._by_url:
+            return self._by_url[url_key], "url"
+        return None, None
+
+    def drop_session(self, session_id: str):
+        """Forget a session's cached update, sequence counter and any URL entries it owns"""
+        self._by_session.pop(session_id, None)
+        self._sequences.pop(session_id, None)
+        for url_key in [k for k, c in self._by_url.items() if c.session_id == session_id]:
+            del self._by_url[url_key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        return {
+            'sessions': len(self._by_session),
+            'urls': len(self._by_url),
+            'encoded_bytes': sum(len(c.payload) for c in self._by_session.values())
+        }
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark for turning iCal VEVENTs into the assignments DataFrame
+Compares the original per-event conversion (pytz lookup, astimezone and strftime per event,
+a list of dicts, then pd.to_datetime re-parsing the due dates) with what icalscrape.fetch_assignments
+runs now: assignment_from_event for each new or changed event (synced into the event store), then
+load_records + record_columns + assignments_frame (one vectorized timezone conversion and sort)
+Calendar.from_ical is shared by both and timed separately
+Usage: python bench_ical_assignments.py [event_count]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+import pytz
+from icalendar import Calendar
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "C++"))
+import icalscrape
+import ical_sync
+
+EVENTS = 50_000
+RUNS = 5
+
+
+def synthetic_feed(event_count=EVENTS):
+    """A school-style feed mixing UTC, TZID-qualified, floating and all-day events"""
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//bench//EN"]
+    for i in range(event_count):
+        day = f"2026{(i % 12) + 1:02d}{(i % 28) + 1:02d}"
+        hour = f"{i % 24:02d}"
+        kind = i % 4
+        if kind == 0:
+            start, end = f"DTSTART:{day}T{hour}0000Z", f"DTEND:{day}T{hour}5900Z"
+        elif kind == 1:
+            start, end = f"DTSTART;TZID=America/New_York:{day}T{hour}1500", f"DTEND;TZID=America/New_York:{day}T{hour}4500"
+        elif kind == 2:
+            start, end = f"DTSTART:{day}T{hour}0000", f"DTEND:{day}T{hour}3000"
+        else:
+            start, end = f"DTSTART;VALUE=DATE:{day}", f"DTEND;VALUE=DATE:{day}"
+        lines += [
+            "BEGIN:VEVENT", f"UID:assignment-{i}@bench", "DTSTAMP:20260101T000000Z", start, end,
+            f"SUMMARY:Assignment {i}", f"DESCRIPTION:Problem set {i} - read chapter {i % 30}", "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(lines) + "\r\n"
+
+
+def baseline_frame(components):
+    """The original fetch_assignments conversion loop"""
+    assignments = []
+    for component in components:
+        start_date = component.get('dtstart').dt
+        due_date = component.get('dtend').dt
+        if not isinstance(start_date, datetime):
+            start_date = datetime.combine(start_date, datetime.min.time())
+        if not isinstance(due_date, datetime):
+            due_date = datetime.combine(due_date, datetime.min.time())
+        local_tz = pytz.timezone(icalscrape.LOCAL_TZ)
+        if start_date.tzinfo is not None:
+            start_date = start_date.astimezone(local_tz)
+        if due_date.tzinfo is not None:
+            due_date = due_date.astimezone(local_tz)
+        assignments.append({
+            'title': str(component.get('summary', 'No Title')),
+            'description': str(component.get('description', 'No Description')),
+            'date_assigned': start_date.strftime('%Y-%m-%d %H:%M'),
+            'date_due': due_date.strftime('%Y-%m-%d %H:%M'),
+            'uid': str(component.get('uid', '')),
+        })
+    df = pd.DataFrame(assignments)
+    df['date_due'] = pd.to_datetime(df['date_due'])
+    return df.sort_values('date_due')
+
+
+def convert_events(components):
+    """The per-event work of a sync where every event is new: assignment_from_event for each"""
+    return [icalscrape.assignment_from_event(component) for component in components]
+
+
+def stored_frame(feed, path):
+    """fetch_assignments after the sync: stored records -> columns -> DataFrame"""
+    return icalscrape.assignments_frame(icalscrape.record_columns(ical_sync.load_records(feed, path=path)))
+
+
+def measure(function, *args):
+    times = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        result = function(*args)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times), result
+
+
+def main():
+    event_count = int(sys.argv[1]) if len(sys.argv) > 1 else EVENTS
+    text = synthetic_feed(event_count)
+
+    started = time.perf_counter()
+    components = Calendar.from_ical(text).walk('VEVENT')
+    parse_seconds = time.perf_counter() - started
+
+    baseline_seconds, baseline = measure(baseline_frame, components)
+    convert_seconds, _ = measure(convert_events, components)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "store.sqlite")
+        conn = ical_sync.open_store(path)
+        try:
+            # First sync of the feed - every event is converted and stored (run once)
+            started = time.perf_counter()
+            ical_sync.sync_events("bench", text, icalscrape.assignment_from_event, conn=conn)
+            sync_seconds = time.perf_counter() - started
+        finally:
+            conn.close()
+        frame_seconds, stored = measure(stored_frame, "bench", path)
+
+    # Same rows and due times; ties on date_due are ordered differently (the baseline sort is not stable)
+    # and date_assigned is now a datetime column instead of a string
+    expected = baseline.sort_values(['date_due', 'uid'], ignore_index=True)
+    actual = stored.sort_values(['date_due', 'uid'], ignore_index=True)
+    matches = (
+        expected['uid'].tolist() == actual['uid'].tolist()
+        and expected['date_due'].tolist() == actual['date_due'].tolist()
+        and expected['date_assigned'].tolist() == actual['date_assigned'].dt.strftime('%Y-%m-%d %H:%M').tolist()
+    )
+
+    print(f"VEVENT -> DataFrame: {event_count} synthetic events ({len(text) / 1024 / 1024:.1f} MB feed)")
+    print("=" * 72)
+    print(f"{'Calendar.from_ical + walk (shared)':<44} {parse_seconds * 1000:9.1f} ms")
+    print(f"{'per-event pytz/strftime + dicts (baseline)':<44} {baseline_seconds * 1000:9.1f} ms")
+    print(f"{'assignment_from_event for every event':<44} {convert_seconds * 1000:9.1f} ms")
+    print(f"{'stored records -> DataFrame (every run)':<44} {frame_seconds * 1000:9.1f} ms")
+    print(f"{'  convert + DataFrame, every event changed':<44} {(convert_seconds + frame_seconds) * 1000:9.1f} ms  "
+          f"{baseline_seconds / (convert_seconds + frame_seconds):5.1f}x")
+    print(f"{'  DataFrame only, feed unchanged':<44} {frame_seconds * 1000:9.1f} ms  "
+          f"{(parse_seconds + baseline_seconds) / frame_seconds:5.1f}x vs baseline + from_ical")
+    print(f"{'first sync_events (parse, convert, store)':<44} {sync_seconds * 1000:9.1f} ms")
+    print(f"Output matches baseline: {matches}")
+    return 0 if matches else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark for sjsreview listing-page parsing
+Compares the original full-tree html.parser + per-field select_one approach with
+sjsreview_parser (scoped tree or C parser, single pass per article):
+parse time per page and memory held by each approach's parse tree
+Usage: python bench_sjsreview_parse.py [saved_listing_page.html]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+import sjsreview_parser
+
+RUNS = 30
+TREE_COPIES = 5
+
+
+def parse_baseline(content):
+    """The original reviewlambda/reviewscrape parsing"""
+    soup = BeautifulSoup(content, "html.parser")
+    article_blocks = soup.select("#contentleft .profile-rendered.catlist-panel.catlist_sidebar")
+    articles = []
+
+    for post in article_blocks:
+        title_tag = post.select_one("h2 a")
+        if not title_tag:
+            continue
+
+        author_tag = post.select_one(".catlist-writer")
+        date_tag = post.select_one(".catlist-date .time-wrapper")
+        description_tag = post.select_one(".catlist-teaser p")
+        image_tag = post.select_one(".catlist-panel-media img")
+
+        articles.append({
+            "title": title_tag.get_text(strip=True),
+            "author": author_tag.get_text(strip=True).replace(",", "") if author_tag else "",
+            "date": date_tag.get_text(strip=True) if date_tag else "",
+            "description": description_tag.get_text(strip=True) if description_tag else "",
+            "link": title_tag["href"],
+            "image_url": image_tag["src"] if image_tag else ""
+        })
+
+    return articles
+
+
+def synthetic_page(article_count=20, chrome_links=600):
+    """A WordPress-style category page: heavy header/nav/sidebar/footer around #contentleft"""
+    nav = "".join(f'<li class="menu-item"><a href="https://www.sjsreview.com/tag/t{i}/">Tag {i}</a></li>' for i in range(chrome_links))
+    sidebar = "".join(
+        f'<div class="widget"><h3>Widget {i}</h3><p>' + "Sidebar filler text. " * 20 + "</p></div>" for i in range(40)
+    )
+    posts = "".join(f"""
+        <div class="profile-rendered catlist-panel catlist_sidebar">
+          <div class="catlist-panel-media"><a href="https://www.sjsreview.com/{i}/news/story-{i}/"><img src="https://www.sjsreview.com/wp-content/uploads/{i}.jpg" alt=""></a></div>
+          <div class="catlist-textarea">
+            <h2 class="catlist-panel-headline"><a href="https://www.sjsreview.com/{i}/news/story-{i}/">Story headline number {i}</a></h2>
+            <div class="catlist-writer"><a href="/staff/{i}">Writer {i}</a>, </div>
+            <div class="catlist-date"><span class="time-wrapper">October {i % 28 + 1}, 2025</span></div>
+            <div class="catlist-teaser"><p>{"Teaser sentence for the story. " * 6}</p></div>
+          </div>
+        </div>""" for i in range(article_count))
+    return f"""<!DOCTYPE html><html><head><title>News</title>
+        <link rel="next" href="https://www.sjsreview.com/category/news/page/2/">
+        {"<script>var x = 1;</script>" * 30}</head><body>
+        <header><nav><ul>{nav}</ul></nav></header>
+        <div id="content"><div id="contentleft">{posts}</div><aside id="sidebar">{sidebar}</aside></div>
+        <footer><ul>{nav}</ul></footer></body></html>""".encode("utf-8")
+
+
+def build_lxml_tree(content):
+    import lxml.html
+    return lxml.html.fromstring(content)
+
+
+# name -> (label, parse function, tree each parse builds)
+APPROACHES = {
+    "baseline": ("full tree, html.parser, select_one", parse_baseline,
+                 lambda c: BeautifulSoup(c, "html.parser")),
+    "soup": ("sjsreview_parser, scoped html.parser", lambda c: sjsreview_parser.parse_listing(c, parser="html.parser"),
+             lambda c: BeautifulSoup(c, "html.parser", parse_only=SoupStrainer(id="contentleft"))),
+    "lxml": ("sjsreview_parser, lxml", lambda c: sjsreview_parser.parse_listing(c, parser="lxml"),
+             build_lxml_tree),
+}
+
+
+def load_page(path=None):
+    if path:
+        with open(path, "rb") as f:
+            return f.read()
+    return synthetic_page()
+
+
+def measure_time(parse, content):
+    times = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        parse(content)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+
+def measure_tree_memory(approach, path=None):
+    """
+    Memory held by one parse tree, measured in a fresh interpreter as resident-set growth
+    RSS covers libxml2's C allocations, which tracemalloc cannot see
+    """
+    output = subprocess.run(
+        [sys.executable, __file__, "--memory-child", approach] + ([path] if path else []),
+        capture_output=True, text=True, check=True
+    ).stdout
+    return int(output.strip().splitlines()[-1])
+
+
+def resident_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def memory_child(approach, path=None):
+    content = load_page(path)
+    build_tree = APPROACHES[approach][2]
+    build_tree(content)
+
+    # Keep several trees alive so allocator reuse of freed memory does not hide the cost
+    before = resident_bytes()
+    trees = [build_tree(content) for _ in range(TREE_COPIES)]
+    print((resident_bytes() - before) // len(trees))
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--memory-child":
+        memory_child(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+        return 0
+
+    path = sys.argv[1] if len(sys.argv) > 1 else None
+    content = load_page(path)
+    source = path or "synthetic page"
+
+    baseline_articles = parse_baseline(content)
+    approaches = ["baseline", "soup"] + (["lxml"] if sjsreview_parser.PARSER == "lxml" else [])
+    for approach in approaches[1:]:
+        if APPROACHES[approach][1](content)[0] != baseline_articles:
+            print(f"WARNING: {APPROACHES[approach][0]} output differs from the baseline")
+
+    print(f"Listing page parse: {source} ({len(content) / 1024:.0f} KB, {len(baseline_articles)} articles)")
+    print("=" * 84)
+    if not os.path.exists("/proc/self/statm"):
+        print("(tree memory needs /proc - Linux only)")
+    baseline_time = None
+    for approach in approaches:
+        label, parse, _ = APPROACHES[approach]
+        seconds = measure_time(parse, content)
+        tree_bytes = measure_tree_memory(approach, path) if os.path.exists("/proc/self/statm") else 0
+        baseline_time = baseline_time or seconds
+        print(f"{label:<40} {seconds * 1000:8.2f} ms/page  {tree_bytes / 1024:8.0f} KB tree  {baseline_time / seconds:5.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
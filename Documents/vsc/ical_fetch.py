@@ -0,0 +1,106 @@
+"""
+Conditional-GET cache for the iCal feed scripts
+Keeps each feed's ETag/Last-Modified and body in a small SQLite file:
+- unchanged feed (304, or 200 with an identical body): one round trip, served from the cache
+- changed feed: downloaded once, then cached for the next run
+ical_sync builds the UID-keyed event store on top of this
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+
+import requests
+
+CACHE_PATH = os.environ.get("ICAL_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ical_cache.sqlite"))
+REQUEST_TIMEOUT = (5, 30)
+
+_session = None
+
+
+def get_session():
+    global _session
+    if _session is None:
+        _session = requests.Session()
+    return _session
+
+
+def open_cache(path=CACHE_PATH):
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS feeds (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            body_sha256 TEXT NOT NULL,
+            body TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+        );
+    """)
+    return conn
+
+
+def _hash_code(digest, code):
+    # Bytecode, constants (string defaults such as 'No Title') and referenced names; nested
+    # functions and comprehensions are hashed the same way instead of by their repr
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            _hash_code(digest, const)
+        else:
+            digest.update(repr(const).encode())
+
+
+def parser_key(parse, version=None):
+    """
+    Cache key of a parse/convert function: its name, an explicit version and a hash of its code
+    The code hash only covers the function itself - callers bump version when a helper it calls changes
+    """
+    code = getattr(parse, "__code__", None)
+    code_hash = ""
+    if code:
+        digest = hashlib.sha1()
+        _hash_code(digest, code)
+        code_hash = digest.hexdigest()[:12]
+    return f"{parse.__module__}.{parse.__qualname__}:{'' if version is None else version}-{code_hash}"
+
+
+def fetch_text(url, headers=None, cache_path=CACHE_PATH):
+    """
+    Fetch a feed body with a conditional request
+    Returns (text, body_sha256, status) where status is 'not_modified', 'unchanged' or 'downloaded'
+    """
+    conn = open_cache(cache_path)
+    try:
+        cached = conn.execute(
+            "SELECT etag, last_modified, body_sha256, body FROM feeds WHERE url = ?", (url,)
+        ).fetchone()
+
+        request_headers = dict(headers or {})
+        if cached:
+            etag, last_modified, _, _ = cached
+            if etag:
+                request_headers["If-None-Match"] = etag
+            if last_modified:
+                request_headers["If-Modified-Since"] = last_modified
+
+        response = get_session().get(url, headers=request_headers, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 304 and cached:
+            return cached[3], cached[2], "not_modified"
+        if response.status_code != 200:
+            raise Exception(f"Failed to fetch iCal feed. Status code: {response.status_code}\nResponse: {response.text}")
+
+        text = response.text
+        body_sha256 = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO feeds (url, etag, last_modified, body_sha256, body, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (url, response.headers.get("ETag"), response.headers.get("Last-Modified"), body_sha256, text, time.time())
+            )
+        status = "unchanged" if cached and cached[2] == body_sha256 else "downloaded"
+        return text, body_sha256, status
+    finally:
+        conn.close()
+
@@ -0,0 +1,191 @@
+"""
+UID-keyed incremental sync of iCal feeds into a local SQLite store
+- Each VEVENT is keyed by (UID, RECURRENCE-ID) and versioned by SEQUENCE + LAST-MODIFIED,
+  or by a hash of its content (minus DTSTAMP) when the feed does not set LAST-MODIFIED;
+  events without a UID are keyed by that content hash instead
+- Only new or changed events are converted and upserted; events gone from the feed are deleted
+- Every sync reports the diff, and unchanged feeds (304 / same body) skip parsing entirely
+- Records are tagged with the converter's version (explicit, plus a hash of to_record's code), so
+  bumping it or editing to_record re-converts every event
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+
+from icalendar import Calendar
+
+from ical_fetch import CACHE_PATH, fetch_text, parser_key
+
+
+def open_store(path=CACHE_PATH):
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS events (
+            feed TEXT NOT NULL,
+            uid TEXT NOT NULL,
+            recurrence_id TEXT NOT NULL DEFAULT '',
+            version TEXT NOT NULL,
+            sort_key TEXT,
+            data TEXT,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (feed, uid, recurrence_id)
+        );
+        CREATE INDEX IF NOT EXISTS events_by_sort_key ON events (feed, sort_key);
+        CREATE TABLE IF NOT EXISTS synced_feeds (
+            feed TEXT PRIMARY KEY,
+            body_sha256 TEXT NOT NULL,
+            synced_at REAL NOT NULL
+        );
+    """)
+    return conn
+
+
+def content_hash(component):
+    # DTSTAMP is regenerated on every feed build and would make every event look changed
+    lines = [line for line in component.to_ical().splitlines() if not line.startswith(b'DTSTAMP')]
+    return hashlib.sha1(b'\n'.join(lines)).hexdigest()
+
+
+def event_key(component):
+    """(UID, RECURRENCE-ID) - a UID-less event is keyed by its content hash instead"""
+    recurrence_id = component.get('recurrence-id')
+    uid = str(component.get('uid', '')) or f"nouid:{content_hash(component)}"
+    return uid, recurrence_id.to_ical().decode() if recurrence_id is not None else ''
+
+
+def event_version(component):
+    """SEQUENCE + LAST-MODIFIED when the feed sets it, otherwise a hash of the event without DTSTAMP"""
+    sequence = str(component.get('sequence', 0))
+    last_modified = component.get('last-modified')
+    if last_modified is not None:
+        return f"{sequence}|{last_modified.to_ical().decode()}"
+    return f"{sequence}|{content_hash(component)}"
+
+
+def sync_events(feed, ics_text, to_record, sort_field=None, conn=None, version=None):
+    """
+    Upsert a feed's events into the store and return the diff
+    to_record(component) -> dict, or None to keep the event out of exports (it is still tracked)
+    version: the converter's version - bump it when to_record or a helper it calls changes
+    Returns {'added': [...], 'updated': [...], 'removed': [...], 'unchanged': n}
+    """
+    own_conn = conn is None
+    conn = conn or open_store()
+    try:
+        stored = {
+            (uid, recurrence_id): (stored_version, data)
+            for uid, recurrence_id, stored_version, data in conn.execute(
+                "SELECT uid, recurrence_id, version, data FROM events WHERE feed = ?", (feed,)
+            )
+        }
+
+        diff = {'added': [], 'updated': [], 'removed': [], 'unchanged': 0}
+        recorder = parser_key(to_record, version)
+        upserts = []
+        seen = set()
+        now = time.time()
+
+        for component in Calendar.from_ical(ics_text).walk('VEVENT'):
+            key = event_key(component)
+            if key in seen:
+                if not key[0].startswith('nouid:'):
+                    continue
+                # Identical UID-less events are separate entries, as in the feed - number the repeats
+                repeat = 2
+                while (f"{key[0]}#{repeat}", key[1]) in seen:
+                    repeat += 1
+                key = (f"{key[0]}#{repeat}", key[1])
+            seen.add(key)
+
+            row_version = f"{recorder}|{event_version(component)}"
+            previous = stored.get(key)
+            if previous is not None and previous[0] == row_version:
+                diff['unchanged'] += 1
+                continue
+
+            record = to_record(component)
+            sort_key = str(record.get(sort_field, '')) if record and sort_field else None
+            upserts.append((feed, key[0], key[1], row_version, sort_key, json.dumps(record) if record is not None else None, now))
+            if record is not None:
+                diff['updated' if previous is not None else 'added'].append({'uid': key[0], **record})
+
+        removed = [key for key in stored if key not in seen]
+        for uid, recurrence_id in removed:
+            data = stored[(uid, recurrence_id)][1]
+            if data is not None:
+                diff['removed'].append({'uid': uid, **json.loads(data)})
+
+        with conn:
+            conn.executemany("""
+                INSERT INTO events (feed, uid, recurrence_id, version, sort_key, data, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (feed, uid, recurrence_id) DO UPDATE SET
+                    version = excluded.version, sort_key = excluded.sort_key,
+                    data = excluded.data, updated_at = excluded.updated_at
+            """, upserts)
+            conn.executemany(
+                "DELETE FROM events WHERE feed = ? AND uid = ? AND recurrence_id = ?",
+                [(feed, uid, recurrence_id) for uid, recurrence_id in removed]
+            )
+        return diff
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def sync_feed(url, to_record, headers=None, sort_field=None, feed=None, path=CACHE_PATH, version=None):
+    """
+    Fetch a feed with a conditional request and sync it into the store (version: see sync_events)
+    Returns the diff plus 'feed_status' ('not_modified', 'unchanged' or 'downloaded') and 'changed'
+    """
+    feed = feed or url
+    text, body_sha256, feed_status = fetch_text(url, headers=headers, cache_path=path)
+    # A new converter must see the body again even if the feed itself did not change
+    sync_key = f"{body_sha256}|{parser_key(to_record, version)}"
+
+    conn = open_store(path)
+    try:
+        synced = conn.execute("SELECT body_sha256 FROM synced_feeds WHERE feed = ?", (feed,)).fetchone()
+        if synced and synced[0] == sync_key:
+            diff = {'added': [], 'updated': [], 'removed': [], 'unchanged': count_events(feed, conn)}
+        else:
+            diff = sync_events(feed, text, to_record, sort_field=sort_field, conn=conn, version=version)
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO synced_feeds (feed, body_sha256, synced_at) VALUES (?, ?, ?)",
+                    (feed, sync_key, time.time())
+                )
+    finally:
+        conn.close()
+
+    diff['feed_status'] = feed_status
+    diff['changed'] = bool(diff['added'] or diff['updated'] or diff['removed'])
+    return diff
+
+
+def count_events(feed, conn):
+    return conn.execute("SELECT COUNT(*) FROM events WHERE feed = ? AND data IS NOT NULL", (feed,)).fetchone()[0]
+
+
+def load_records(feed, path=CACHE_PATH):
+    """Exported records of a feed, ordered by sort key via the index"""
+    conn = open_store(path)
+    try:
+        return [
+            {'uid': uid, **json.loads(data)}
+            for uid, data in conn.execute(
+                "SELECT uid, data FROM events WHERE feed = ? AND data IS NOT NULL ORDER BY sort_key, uid", (feed,)
+            )
+        ]
+    finally:
+        conn.close()
+
+
+def print_diff(diff, label='title'):
+    print(f"Feed {diff['feed_status']}: {len(diff['added'])} added, {len(diff['updated'])} updated, "
+          f"{len(diff['removed'])} removed, {diff['unchanged']} unchanged")
+    for change in ('added', 'updated', 'removed'):
+        for record in diff[change]:
+            print(f"  {change}: {record.get(label, record['uid'])}")
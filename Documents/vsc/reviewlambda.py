@@ -1,8 +1,17 @@
+import gzip
+import hashlib
 import json
+import os
+import sqlite3
+import time
 import requests
-from bs4 import BeautifulSoup
 import boto3
+import sjsreview_parser
+from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 CATEGORY_URLS = {
     "news": "https://www.sjsreview.com/category/news/",
@@ -12,72 +21,224 @@ CATEGORY_URLS = {
     "mavericks": "https://www.sjsreview.com/category/mavericks/"
 }
 
-def scrape_articles(section, url):
-    response = requests.get(url)
-    soup = BeautifulSoup(response.content, "html.parser")
-    article_blocks = soup.select("#contentleft .profile-rendered.catlist-panel.catlist_sidebar")
+BUCKET_NAME = "sjsreview-articles-json"  # <--- your bucket name
+OBJECT_KEY = "articles.json"
+CACHE_CONTROL = "public, max-age=300"
+
+# (connect, read) timeout per request, in seconds
+REQUEST_TIMEOUT = (3.05, 10)
+
+# Local article index - /tmp survives between warm invocations and is re-seeded from S3 after a cold start
+# (the SEEN_LINKS_DB environment variable overrides the path; it is read when the store is opened)
+SEEN_LINKS_DB = "/tmp/sjsreview_seen_links.db"
+# Upper bound on listing pages per section when the index has no overlap yet
+MAX_PAGES_PER_SECTION = int(os.environ.get("MAX_PAGES_PER_SECTION", "50"))
+
+def build_session():
+    # One keep-alive pool sized for all sections, retrying transient failures with backoff
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"]
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=len(CATEGORY_URLS), max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+# Created at import so warm Lambda invocations reuse open connections
+session = build_session()
+
+def parse_listing(section, content):
+    return sjsreview_parser.parse_listing(content, section)
+
+def listing_page_url(url, page):
+    return url if page == 1 else f"{url.rstrip('/')}/page/{page}/"
+
+def crawl_section(section, url, seen_links, max_pages=MAX_PAGES_PER_SECTION):
+    # Follow the section's pagination until a page holds nothing new - crawl cost tracks new articles
+    # Runs in one worker per section - each page is parsed as soon as it arrives, overlapping the
+    # other sections' fetches
+    started = time.perf_counter()
+    timing = {"section": section, "pages": 0, "fetch_ms": 0.0, "parse_ms": 0.0}
     articles = []
+    page_url = url
+    try:
+        for page in range(1, max_pages + 1):
+            page_started = time.perf_counter()
+            response = session.get(page_url, timeout=REQUEST_TIMEOUT)
+            if page > 1 and response.status_code == 404:
+                break
+            response.raise_for_status()
+            fetched = time.perf_counter()
+            page_articles, next_url = parse_listing(section, response.content)
+            timing["fetch_ms"] += (fetched - page_started) * 1000
+            timing["parse_ms"] += (time.perf_counter() - fetched) * 1000
+            timing["pages"] = page
 
-    for post in article_blocks:
-        title_tag = post.select_one("h2 a")
-        if not title_tag:
-            continue
+            articles.extend(page_articles)
+            if not page_articles or all(article["link"] in seen_links for article in page_articles):
+                break
+            page_url = next_url or listing_page_url(url, page + 1)
+    except Exception as e:
+        timing["error"] = str(e)
 
-        title = title_tag.get_text(strip=True)
-        link = title_tag["href"]
+    timing["fetch_ms"] = round(timing["fetch_ms"], 1)
+    timing["parse_ms"] = round(timing["parse_ms"], 1)
+    timing["articles"] = len(articles)
+    timing["new_articles"] = sum(1 for article in articles if article["link"] not in seen_links)
+    timing["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return articles, timing
 
-        author_tag = post.select_one(".catlist-writer")
-        author = author_tag.get_text(strip=True).replace(",", "") if author_tag else ""
+def open_store(path=None):
+    conn = sqlite3.connect(path or os.environ.get("SEEN_LINKS_DB", SEEN_LINKS_DB))
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS articles (
+            link TEXT PRIMARY KEY,
+            section TEXT NOT NULL,
+            data TEXT NOT NULL,
+            crawl_run INTEGER NOT NULL,
+            position INTEGER NOT NULL
+        )
+    """)
+    return conn
 
-        date_tag = post.select_one(".catlist-date .time-wrapper")
-        date = date_tag.get_text(strip=True) if date_tag else ""
+def load_seen_links(conn):
+    return {row[0] for row in conn.execute("SELECT link FROM articles")}
 
-        description_tag = post.select_one(".catlist-teaser p")
-        description = description_tag.get_text(strip=True) if description_tag else ""
+def save_articles(conn, articles):
+    # New links are added under a new crawl run; known links only refresh their data (first section wins)
+    run = conn.execute("SELECT COALESCE(MAX(crawl_run), 0) + 1 FROM articles").fetchone()[0]
+    with conn:
+        conn.executemany("""
+            INSERT INTO articles (link, section, data, crawl_run, position) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(link) DO UPDATE SET data = excluded.data WHERE articles.section = excluded.section
+        """, [
+            (article["link"], article["section"], json.dumps(article), run, position)
+            for position, article in enumerate(articles)
+        ])
 
-        image_tag = post.select_one(".catlist-panel-media img")
-        image_url = image_tag["src"] if image_tag else ""
+def load_archive(conn):
+    # Newest crawl first, page order within a crawl
+    return [json.loads(row[0]) for row in conn.execute("SELECT data FROM articles ORDER BY crawl_run DESC, position")]
 
-        articles.append({
-            "title": title,
-            "author": author,
-            "date": date,
-            "description": description,
-            "link": link,
-            "image_url": image_url,
-            "section": section
-        })
+def seed_store_from_s3(conn, s3, bucket_name=BUCKET_NAME, key=OBJECT_KEY):
+    # After a cold start the local index is empty - rebuild it from the published archive
+    try:
+        stored = s3.get_object(Bucket=bucket_name, Key=key)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return 0
+        raise
 
-    return articles
+    body = stored["Body"].read()
+    if stored.get("ContentEncoding") == "gzip":
+        body = gzip.decompress(body)
+    articles = [article for article in json.loads(body).get("articles", []) if article.get("link") and article.get("section")]
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO articles (link, section, data, crawl_run, position) VALUES (?, ?, ?, 0, ?)",
+            [(article["link"], article["section"], json.dumps(article), position) for position, article in enumerate(articles)]
+        )
+    return len(articles)
 
-def lambda_handler(event, context):
-    all_articles = []
-    seen_links = set()
+def content_hash(articles):
+    # Hash of the article set only - lastUpdated changes every run and must not count as a change
+    canonical = json.dumps(articles, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def stored_content_hash(s3, bucket_name, key):
+    try:
+        head = s3.head_object(Bucket=bucket_name, Key=key)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+    return head.get("Metadata", {}).get("content-sha256")
 
-    for section, url in CATEGORY_URLS.items():
-        section_articles = scrape_articles(section, url)
-        for article in section_articles:
-            if article["link"] not in seen_links:
-                all_articles.append(article)
-                seen_links.add(article["link"])
+def publish_articles(s3, articles, bucket_name=BUCKET_NAME, key=OBJECT_KEY):
+    # Skip the upload when the stored object already holds this article set
+    digest = content_hash(articles)
+    if stored_content_hash(s3, bucket_name, key) == digest:
+        return False, digest
 
     result = {
         "lastUpdated": datetime.utcnow().isoformat() + "Z",
-        "articles": all_articles
+        "articles": articles
     }
-
-    # Upload to S3
-    s3 = boto3.client("s3")
-    bucket_name = "sjsreview-articles-json"  # <--- your bucket name
-    key = "articles.json"
+    body = gzip.compress(json.dumps(result, separators=(",", ":")).encode("utf-8"), mtime=0)
     s3.put_object(
         Bucket=bucket_name,
         Key=key,
-        Body=json.dumps(result, indent=2),
-        ContentType="application/json"
+        Body=body,
+        ContentType="application/json",
+        ContentEncoding="gzip",
+        CacheControl=CACHE_CONTROL,
+        Metadata={"content-sha256": digest}
     )
+    return True, digest
+
+def lambda_handler(event, context):
+    started = time.perf_counter()
+    crawled_articles = []
+    crawled_links = set()
+    timings = {}
+
+    s3 = boto3.client("s3")
+    conn = open_store()
+    try:
+        seeded = 0
+        if conn.execute("SELECT 1 FROM articles LIMIT 1").fetchone() is None:
+            seeded = seed_store_from_s3(conn, s3)
+        seen_links = load_seen_links(conn)
+
+        with ThreadPoolExecutor(max_workers=len(CATEGORY_URLS)) as executor:
+            results = list(executor.map(lambda item: crawl_section(item[0], item[1], seen_links), CATEGORY_URLS.items()))
+
+        if all("error" in timing and not section_articles for section_articles, timing in results):
+            raise RuntimeError(f"All section fetches failed: {[timing['error'] for _, timing in results]}")
+
+        # Merge in CATEGORY_URLS order so duplicates keep their first section, as before
+        for section_articles, timing in results:
+            timings[timing["section"]] = timing
+            for article in section_articles:
+                if article["link"] not in crawled_links:
+                    crawled_articles.append(article)
+                    crawled_links.add(article["link"])
+
+        # A section that failed part-way is not saved at all: its first pages would count as seen and the
+        # next crawl would stop before reaching the pages after the failure
+        failed_sections = [section for section, timing in timings.items() if "error" in timing]
+        saved_articles = [article for article in crawled_articles if article["section"] not in failed_sections]
+        save_articles(conn, saved_articles)
+        all_articles = load_archive(conn)
+    finally:
+        conn.close()
+
+    # A failed section may be missing articles - keep the published object until every section succeeds
+    if failed_sections:
+        uploaded, digest = False, None
+        message = f"Sections {failed_sections} failed, skipped upload to {BUCKET_NAME}/{OBJECT_KEY}"
+    else:
+        # Upload to S3 only if the articles changed
+        uploaded, digest = publish_articles(s3, all_articles)
+        if uploaded:
+            message = f"{len(all_articles)} articles uploaded to {BUCKET_NAME}/{OBJECT_KEY}"
+        else:
+            message = f"{len(all_articles)} articles unchanged, skipped upload to {BUCKET_NAME}/{OBJECT_KEY}"
 
     return {
         "statusCode": 200,
-        "body": json.dumps(f"{len(all_articles)} articles uploaded to {bucket_name}/{key}")
+        "body": json.dumps({
+            "message": message,
+            "uploaded": uploaded,
+            "content_sha256": digest,
+            "new_articles": sum(1 for article in saved_articles if article["link"] not in seen_links),
+            "seeded_from_s3": seeded,
+            "failed_sections": failed_sections,
+            "timings": timings,
+            "total_ms": round((time.perf_counter() - started) * 1000, 1)
+        })
     }
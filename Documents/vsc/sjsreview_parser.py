@@ -0,0 +1,175 @@
+"""
+Fast parsing for sjsreview.com category listing pages
+- With lxml installed the page is parsed by libxml2 in C and only #contentleft is walked
+- Without it, BeautifulSoup builds a tree of #contentleft only (SoupStrainer) with html.parser
+Either way each article block is read in a single walk over its elements
+instead of one CSS query per field
+"""
+
+import re
+
+try:
+    import lxml.html
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+ARTICLE_BLOCK_CLASSES = ("profile-rendered", "catlist-panel", "catlist_sidebar")
+
+# Pagination links live outside #contentleft, so they are found in the raw bytes instead of the tree
+# Only rel="next" or the a.next.page-numbers class pair counts - carousel/menu "next" classes
+# (slick-next, next-post, ...) are not pagination
+_CLASS_TOKEN = rb'(?=[^"\']*(?<=["\'\s])%s(?=["\'\s]))'
+NEXT_TAG_PATTERN = re.compile(
+    rb'<(?:link|a)\b[^>]*(?:\brel=["\']next["\']|\bclass=["\']'
+    + _CLASS_TOKEN % rb'next' + _CLASS_TOKEN % rb'page-numbers'
+    + rb'[^"\']*["\'])[^>]*>', re.I
+)
+NAV_PREVIOUS_PATTERN = re.compile(rb'class=["\'][^"\']*\bnav-previous\b[^"\']*["\'][^>]*>\s*<a\b[^>]*>', re.I)
+HREF_PATTERN = re.compile(rb'\bhref=["\']([^"\']+)["\']', re.I)
+
+
+def parse_listing(content, section=None, parser=None):
+    """
+    Parse a category listing page
+    Returns (articles, next_page_url); articles carry a section field when one is given
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+
+    if (parser or PARSER) == "lxml":
+        articles = _parse_articles_lxml(content)
+    else:
+        articles = _parse_articles_soup(content)
+
+    if section is not None:
+        for article in articles:
+            article["section"] = section
+    return articles, find_next_page(content)
+
+
+def find_next_page(content):
+    """URL of the next (older) listing page, if the page links one"""
+    match = NEXT_TAG_PATTERN.search(content) or NAV_PREVIOUS_PATTERN.search(content)
+    if not match:
+        return None
+    href = HREF_PATTERN.search(match.group(0))
+    return href.group(1).decode("utf-8") if href else None
+
+
+def _article(title, link, author, date, description, image_url):
+    return {
+        "title": title,
+        "author": (author or "").replace(",", ""),
+        "date": date or "",
+        "description": description or "",
+        "link": link,
+        "image_url": image_url or ""
+    }
+
+
+# lxml
+
+def _text(element):
+    # Same result as BeautifulSoup's get_text(strip=True)
+    return "".join(piece.strip() for piece in element.itertext())
+
+
+def _parse_articles_lxml(content):
+    try:
+        document = lxml.html.fromstring(content)
+    except Exception:
+        return []
+    container = document.get_element_by_id("contentleft", None)
+    if container is None:
+        return []
+
+    articles = []
+    # Any element with the three classes, like the soup path's class selector (comments have no str tag)
+    for block in container.iter():
+        if not isinstance(block.tag, str):
+            continue
+        classes = (block.get("class") or "").split()
+        if all(name in classes for name in ARTICLE_BLOCK_CLASSES):
+            article = _extract_article_lxml(block)
+            if article is not None:
+                articles.append(article)
+    return articles
+
+
+def _extract_article_lxml(block):
+    title = link = author = date = description = image_url = None
+
+    for element in block.iterdescendants():
+        if not isinstance(element.tag, str):
+            continue
+        classes = (element.get("class") or "").split()
+
+        if link is None and element.tag == "h2":
+            title_tag = next(element.iterdescendants("a"), None)
+            if title_tag is not None:
+                title = _text(title_tag)
+                link = title_tag.get("href")
+        elif author is None and "catlist-writer" in classes:
+            author = _text(element)
+        elif date is None and "catlist-date" in classes:
+            date_tag = next((e for e in element.iterdescendants() if "time-wrapper" in (e.get("class") or "").split()), None)
+            if date_tag is not None:
+                date = _text(date_tag)
+        elif description is None and "catlist-teaser" in classes:
+            description_tag = next(element.iterdescendants("p"), None)
+            if description_tag is not None:
+                description = _text(description_tag)
+        elif image_url is None and "catlist-panel-media" in classes:
+            image_tag = next(element.iterdescendants("img"), None)
+            if image_tag is not None:
+                image_url = image_tag.get("src", "")
+
+    if link is None:
+        return None
+    return _article(title, link, author, date, description, image_url)
+
+
+# BeautifulSoup fallback
+
+def _parse_articles_soup(content):
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    soup = BeautifulSoup(content, "html.parser", parse_only=SoupStrainer(id="contentleft"))
+    articles = []
+    for block in soup.select("." + ".".join(ARTICLE_BLOCK_CLASSES)):
+        article = _extract_article_soup(block)
+        if article is not None:
+            articles.append(article)
+    return articles
+
+
+def _extract_article_soup(block):
+    title = link = author = date = description = image_url = None
+
+    for element in block.find_all(True):
+        classes = element.get("class") or ()
+
+        if link is None and element.name == "h2":
+            title_tag = element.find("a")
+            if title_tag is not None:
+                title = title_tag.get_text(strip=True)
+                link = title_tag.get("href")
+        elif author is None and "catlist-writer" in classes:
+            author = element.get_text(strip=True)
+        elif date is None and "catlist-date" in classes:
+            date_tag = element.find(class_="time-wrapper")
+            if date_tag is not None:
+                date = date_tag.get_text(strip=True)
+        elif description is None and "catlist-teaser" in classes:
+            description_tag = element.find("p")
+            if description_tag is not None:
+                description = description_tag.get_text(strip=True)
+        elif image_url is None and "catlist-panel-media" in classes:
+            image_tag = element.find("img")
+            if image_tag is not None:
+                image_url = image_tag.get("src", "")
+
+    if link is None:
+        return None
+    return _article(title, link, author, date, description, image_url)
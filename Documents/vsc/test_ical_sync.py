@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Tests for ical_sync's UID-keyed event store
+Run with pytest, or directly: python test_ical_sync.py
+"""
+
+import os
+import sys
+import tempfile
+from unittest import mock
+
+import ical_fetch
+import ical_sync
+
+
+def feed(*events):
+    # Each event is (summary, uid, *extra property lines)
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//test//EN"]
+    for summary, uid, *extra in events:
+        lines += ["BEGIN:VEVENT", f"SUMMARY:{summary}", "DTSTAMP:20260101T000000Z", "DTSTART:20260105T090000Z"]
+        if uid:
+            lines.append(f"UID:{uid}")
+        lines += extra
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(lines) + "\r\n"
+
+
+def to_record(component):
+    to_record.calls += 1
+    return {"title": str(component.get("summary"))}
+
+
+to_record.calls = 0
+
+
+def sync(ics_text, conn):
+    return ical_sync.sync_events("feed", ics_text, to_record, sort_field="title", conn=conn)
+
+
+def titles(conn):
+    return sorted(title for (title,) in conn.execute(
+        "SELECT json_extract(data, '$.title') FROM events WHERE feed = 'feed'"))
+
+
+def test_uid_less_events_are_all_kept():
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = ical_sync.open_store(os.path.join(tmp, "store.sqlite"))
+        try:
+            diff = sync(feed(("Assembly", None), ("Picture day", None), ("Game", "uid-1")), conn)
+            assert sorted(record["title"] for record in diff["added"]) == ["Assembly", "Game", "Picture day"]
+            assert titles(conn) == ["Assembly", "Game", "Picture day"]
+
+            diff = sync(feed(("Assembly", None), ("Picture day", None), ("Game", "uid-1")), conn)
+            assert diff["unchanged"] == 3 and not diff["added"] and not diff["removed"]
+
+            # A UID-less event that changes is replaced, the other one is untouched
+            diff = sync(feed(("Assembly (moved)", None), ("Picture day", None), ("Game", "uid-1")), conn)
+            assert [record["title"] for record in diff["added"]] == ["Assembly (moved)"]
+            assert [record["title"] for record in diff["removed"]] == ["Assembly"]
+            assert titles(conn) == ["Assembly (moved)", "Game", "Picture day"]
+        finally:
+            conn.close()
+
+
+def test_identical_uid_less_events_are_not_merged():
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = ical_sync.open_store(os.path.join(tmp, "store.sqlite"))
+        try:
+            sync(feed(("Assembly", None), ("Assembly", None)), conn)
+            assert titles(conn) == ["Assembly", "Assembly"]
+
+            diff = sync(feed(("Assembly", None)), conn)
+            assert len(diff["removed"]) == 1
+            assert titles(conn) == ["Assembly"]
+        finally:
+            conn.close()
+
+
+
+def test_unchanged_events_are_skipped_and_bumps_update():
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = ical_sync.open_store(os.path.join(tmp, "store.sqlite"))
+        try:
+            sync(feed(("Game", "uid-1", "SEQUENCE:0"), ("Play", "uid-2", "LAST-MODIFIED:20260101T000000Z")), conn)
+
+            # DTSTAMP alone changes on every feed build - not an update, and nothing is re-converted
+            calls = to_record.calls
+            diff = sync(feed(("Game", "uid-1", "SEQUENCE:0"), ("Play", "uid-2", "LAST-MODIFIED:20260101T000000Z"))
+                        .replace("DTSTAMP:20260101T000000Z", "DTSTAMP:20260201T000000Z"), conn)
+            assert diff["unchanged"] == 2 and not diff["added"] and not diff["updated"]
+            assert to_record.calls == calls
+
+            diff = sync(feed(("Game (rescheduled)", "uid-1", "SEQUENCE:1"), ("Play", "uid-2", "LAST-MODIFIED:20260101T000000Z")), conn)
+            assert [record["uid"] for record in diff["updated"]] == ["uid-1"] and diff["unchanged"] == 1
+
+            diff = sync(feed(("Game (rescheduled)", "uid-1", "SEQUENCE:1"), ("Play (cancelled)", "uid-2", "LAST-MODIFIED:20260102T000000Z")), conn)
+            assert [record["title"] for record in diff["updated"]] == ["Play (cancelled)"] and diff["unchanged"] == 1
+            assert titles(conn) == ["Game (rescheduled)", "Play (cancelled)"]
+        finally:
+            conn.close()
+
+
+def test_recurrence_override_has_its_own_key():
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = ical_sync.open_store(os.path.join(tmp, "store.sqlite"))
+        try:
+            series = ("Practice", "uid-1", "RRULE:FREQ=WEEKLY;COUNT=4")
+            override = ("Practice (gym)", "uid-1", "RECURRENCE-ID:20260112T090000Z")
+            diff = sync(feed(series, override), conn)
+            assert len(diff["added"]) == 2
+            assert titles(conn) == ["Practice", "Practice (gym)"]
+
+            # Dropping the override removes only that instance
+            diff = sync(feed(series), conn)
+            assert [record["title"] for record in diff["removed"]] == ["Practice (gym)"] and diff["unchanged"] == 1
+        finally:
+            conn.close()
+
+
+class FakeResponse:
+    def __init__(self, status_code, text="", headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+
+def test_not_modified_feed_skips_parsing():
+    ics_text = feed(("Game", "uid-1"))
+    responses = [FakeResponse(200, ics_text, {"ETag": '"v1"'}), FakeResponse(304)]
+    session = mock.Mock()
+    session.get.side_effect = lambda url, headers=None, timeout=None: responses.pop(0)
+
+    with tempfile.TemporaryDirectory() as tmp, mock.patch.object(ical_fetch, "get_session", return_value=session):
+        path = os.path.join(tmp, "cache.sqlite")
+        diff = ical_sync.sync_feed("https://feed", to_record, path=path)
+        assert diff["feed_status"] == "downloaded" and diff["changed"]
+
+        with mock.patch.object(ical_sync.Calendar, "from_ical") as from_ical:
+            calls = to_record.calls
+            diff = ical_sync.sync_feed("https://feed", to_record, path=path)
+        assert session.get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+        assert diff["feed_status"] == "not_modified" and not diff["changed"]
+        assert diff["unchanged"] == 1
+        assert not from_ical.called and to_record.calls == calls
+        assert [record["title"] for record in ical_sync.load_records("https://feed", path=path)] == ["Game"]
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"ok   {test.__name__}")
+    print(f"{len(tests)} tests passed")
+    sys.exit(0)
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Tests for reviewlambda's S3 publishing against moto's in-memory S3
+Run with pytest, or directly: python test_reviewlambda.py
+"""
+
+import gzip
+import json
+import os
+import sys
+import tempfile
+from unittest import mock
+
+import boto3
+from moto import mock_aws
+
+import reviewlambda
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+ARTICLES = [
+    {"title": "Budget vote", "author": "A", "date": "Oct 1", "description": "", "link": "https://x/1", "image_url": "", "section": "news"},
+    {"title": "Homecoming", "author": "B", "date": "Oct 2", "description": "", "link": "https://x/2", "image_url": "", "section": "culture"},
+]
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b""):
+        self.status_code = status_code
+        self.content = content
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeSession:
+    """Serves listing pages from a dict of url -> list of article links (or an HTTP status code)"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+
+    def get(self, url, timeout=None):
+        self.requested.append(url)
+        if url not in self.pages:
+            return FakeResponse(404)
+        if isinstance(self.pages[url], int):
+            return FakeResponse(self.pages[url])
+        posts = "".join(
+            f'<div class="profile-rendered catlist-panel catlist_sidebar"><h2><a href="{link}">{link}</a></h2></div>'
+            for link in self.pages[url]
+        )
+        return FakeResponse(200, f'<div id="contentleft">{posts}</div>'.encode("utf-8"))
+
+
+def listing(section, pages):
+    url = reviewlambda.CATEGORY_URLS[section]
+    return {reviewlambda.listing_page_url(url, page): links for page, links in enumerate(pages, start=1)}
+
+
+def all_sections(**sections):
+    # Every section gets an (empty) first page unless given, so no section fails with a 404
+    pages = {url: [] for url in reviewlambda.CATEGORY_URLS.values()}
+    for section, section_pages in sections.items():
+        pages.update(listing(section, section_pages))
+    return pages
+
+
+def make_bucket():
+    s3 = boto3.client("s3")
+    s3.create_bucket(Bucket=reviewlambda.BUCKET_NAME)
+    return s3
+
+
+@mock_aws
+def test_first_publish_is_compact_gzip_with_headers():
+    s3 = make_bucket()
+    uploaded, digest = reviewlambda.publish_articles(s3, ARTICLES)
+    assert uploaded
+
+    stored = s3.get_object(Bucket=reviewlambda.BUCKET_NAME, Key=reviewlambda.OBJECT_KEY)
+    assert stored["ContentType"] == "application/json"
+    assert stored["ContentEncoding"] == "gzip"
+    assert stored["CacheControl"] == reviewlambda.CACHE_CONTROL
+    assert stored["Metadata"]["content-sha256"] == digest
+
+    text = gzip.decompress(stored["Body"].read()).decode("utf-8")
+    assert "\n" not in text
+    assert json.loads(text)["articles"] == ARTICLES
+
+
+@mock_aws
+def test_unchanged_articles_skip_upload():
+    s3 = make_bucket()
+    reviewlambda.publish_articles(s3, ARTICLES)
+    first = s3.head_object(Bucket=reviewlambda.BUCKET_NAME, Key=reviewlambda.OBJECT_KEY)
+
+    uploaded, _ = reviewlambda.publish_articles(s3, [dict(article) for article in ARTICLES])
+    assert not uploaded
+
+    second = s3.head_object(Bucket=reviewlambda.BUCKET_NAME, Key=reviewlambda.OBJECT_KEY)
+    assert second["ETag"] == first["ETag"]
+    assert second["LastModified"] == first["LastModified"]
+
+
+@mock_aws
+def test_changed_articles_are_uploaded():
+    s3 = make_bucket()
+    _, first_digest = reviewlambda.publish_articles(s3, ARTICLES)
+
+    changed = ARTICLES + [{"title": "New", "author": "C", "date": "Oct 3", "description": "", "link": "https://x/3", "image_url": "", "section": "sports"}]
+    uploaded, digest = reviewlambda.publish_articles(s3, changed)
+    assert uploaded
+    assert digest != first_digest
+
+    stored = s3.get_object(Bucket=reviewlambda.BUCKET_NAME, Key=reviewlambda.OBJECT_KEY)
+    assert len(json.loads(gzip.decompress(stored["Body"].read()))["articles"]) == 3
+
+
+@mock_aws
+def test_object_without_hash_metadata_is_replaced():
+    s3 = make_bucket()
+    s3.put_object(Bucket=reviewlambda.BUCKET_NAME, Key=reviewlambda.OBJECT_KEY, Body=b"{}")
+
+    uploaded, _ = reviewlambda.publish_articles(s3, ARTICLES)
+    assert uploaded
+
+
+def test_crawl_stops_at_first_fully_seen_page():
+    url = reviewlambda.CATEGORY_URLS["news"]
+    fake = FakeSession(listing("news", [["https://x/5", "https://x/4"], ["https://x/3", "https://x/2"], ["https://x/1"]]))
+    original, reviewlambda.session = reviewlambda.session, fake
+    try:
+        articles, timing = reviewlambda.crawl_section("news", url, seen_links=set())
+        assert [a["link"] for a in articles] == ["https://x/5", "https://x/4", "https://x/3", "https://x/2", "https://x/1"]
+        assert timing["pages"] == 3
+
+        fake.requested.clear()
+        articles, timing = reviewlambda.crawl_section("news", url, seen_links={"https://x/3", "https://x/2", "https://x/1"})
+        assert timing["pages"] == 2
+        assert timing["new_articles"] == 2
+        assert len(fake.requested) == 2
+    finally:
+        reviewlambda.session = original
+
+
+@mock_aws
+def test_handler_keeps_archive_across_invocations():
+    s3 = make_bucket()
+    first = all_sections(news=[["https://x/2"], ["https://x/1"]], sports=[["https://x/s1"]])
+    second = all_sections(news=[["https://x/3", "https://x/2"], ["https://x/1"]], sports=[["https://x/s1"]])
+
+    original_session = reviewlambda.session
+    with tempfile.TemporaryDirectory() as tmp, \
+            mock.patch.dict(os.environ, {"SEEN_LINKS_DB": os.path.join(tmp, "seen.db")}):
+        db_path = os.environ["SEEN_LINKS_DB"]
+        try:
+            reviewlambda.session = FakeSession(first)
+            body = json.loads(reviewlambda.lambda_handler({}, None)["body"])
+            assert body["new_articles"] == 3 and body["uploaded"]
+
+            reviewlambda.session = FakeSession(second)
+            body = json.loads(reviewlambda.lambda_handler({}, None)["body"])
+            assert body["new_articles"] == 1
+            assert body["timings"]["news"]["pages"] == 2
+
+            # Nothing new - no upload
+            body = json.loads(reviewlambda.lambda_handler({}, None)["body"])
+            assert not body["uploaded"]
+
+            # Cold start: a fresh local index is rebuilt from the published archive
+            os.remove(db_path)
+            body = json.loads(reviewlambda.lambda_handler({}, None)["body"])
+            assert body["seeded_from_s3"] == 4
+            assert body["new_articles"] == 0
+
+            stored = s3.get_object(Bucket=reviewlambda.BUCKET_NAME, Key=reviewlambda.OBJECT_KEY)
+            links = [a["link"] for a in json.loads(gzip.decompress(stored["Body"].read()))["articles"]]
+            assert links == ["https://x/3", "https://x/2", "https://x/1", "https://x/s1"]
+        finally:
+            reviewlambda.session = original_session
+
+
+@mock_aws
+def test_handler_skips_upload_when_a_section_fails():
+    s3 = make_bucket()
+    reviewlambda.publish_articles(s3, ARTICLES)
+    before = s3.head_object(Bucket=reviewlambda.BUCKET_NAME, Key=reviewlambda.OBJECT_KEY)
+
+    pages = all_sections(news=[["https://x/3"]])
+    del pages[reviewlambda.CATEGORY_URLS["sports"]]
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            mock.patch.dict(os.environ, {"SEEN_LINKS_DB": os.path.join(tmp, "seen.db")}), \
+            mock.patch.object(reviewlambda, "session", FakeSession(pages)):
+        body = json.loads(reviewlambda.lambda_handler({}, None)["body"])
+
+    assert body["failed_sections"] == ["sports"]
+    assert not body["uploaded"]
+    after = s3.head_object(Bucket=reviewlambda.BUCKET_NAME, Key=reviewlambda.OBJECT_KEY)
+    assert after["ETag"] == before["ETag"]
+
+
+
+@mock_aws
+def test_section_failing_mid_crawl_is_recrawled_in_full():
+    make_bucket()
+    news = [["https://x/3"], ["https://x/2"], ["https://x/1"]]
+    failing = all_sections(news=news)
+    failing[reviewlambda.listing_page_url(reviewlambda.CATEGORY_URLS["news"], 2)] = 500
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            mock.patch.dict(os.environ, {"SEEN_LINKS_DB": os.path.join(tmp, "seen.db")}):
+        with mock.patch.object(reviewlambda, "session", FakeSession(failing)):
+            body = json.loads(reviewlambda.lambda_handler({}, None)["body"])
+        assert body["failed_sections"] == ["news"]
+        assert body["new_articles"] == 0
+
+        # Page 1 was read before the failure, but must not stop the next crawl short of page 3
+        fake = FakeSession(all_sections(news=news))
+        with mock.patch.object(reviewlambda, "session", fake):
+            body = json.loads(reviewlambda.lambda_handler({}, None)["body"])
+        assert body["failed_sections"] == []
+        assert body["timings"]["news"]["pages"] == 3
+        assert body["new_articles"] == 3
+        assert body["uploaded"]
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"ok   {test.__name__}")
+    print(f"{len(tests)} tests passed")
+    sys.exit(0)
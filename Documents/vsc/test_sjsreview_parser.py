@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for sjsreview_parser - the lxml and BeautifulSoup paths must return the same articles
+Run with pytest, or directly: python test_sjsreview_parser.py
+"""
+
+import sys
+
+import sjsreview_parser
+
+BLOCK_CLASSES = " ".join(sjsreview_parser.ARTICLE_BLOCK_CLASSES)
+
+PAGE = f"""<html><head><link rel="next" href="https://www.sjsreview.com/category/news/page/2/"></head><body>
+<nav><a class="slick-next" href="https://www.sjsreview.com/carousel/">Next</a></nav>
+<div class="catlist-panel">Not an article: only one of the block classes</div>
+<div id="contentleft">
+  <div class="{BLOCK_CLASSES}">
+    <div class="catlist-panel-media"><img src="https://x/1.jpg"></div>
+    <h2><a href="https://x/1">  Budget <em>vote</em> </a></h2>
+    <span class="catlist-writer">Ann Lee, Bo Park</span>
+    <span class="catlist-date"><span class="time-wrapper">October 1, 2026</span></span>
+    <div class="catlist-teaser"><p>Teaser <b>one</b></p></div>
+  </div>
+  <!-- a comment between blocks -->
+  <article class="featured {BLOCK_CLASSES}">
+    <h2><a href="https://x/2">Homecoming</a></h2>
+  </article>
+  <li class="{BLOCK_CLASSES}"><h2><a href="https://x/3">Listed</a></h2><span class="catlist-writer">C</span></li>
+  <div class="{BLOCK_CLASSES}"><h2>No link</h2></div>
+  <section class="catlist_sidebar profile-rendered catlist-panel"><h2><a href="https://x/4">Reordered classes</a></h2></section>
+</div>
+<div class="{BLOCK_CLASSES}"><h2><a href="https://x/outside">Outside contentleft</a></h2></div>
+</body></html>"""
+
+
+def test_lxml_and_soup_paths_agree():
+    lxml_articles, lxml_next = sjsreview_parser.parse_listing(PAGE, "news", parser="lxml")
+    soup_articles, soup_next = sjsreview_parser.parse_listing(PAGE, "news", parser="html.parser")
+
+    assert lxml_articles == soup_articles
+    assert lxml_next == soup_next == "https://www.sjsreview.com/category/news/page/2/"
+    assert [article["link"] for article in lxml_articles] == ["https://x/1", "https://x/2", "https://x/3", "https://x/4"]
+
+
+def test_article_fields():
+    articles, _ = sjsreview_parser.parse_listing(PAGE, "news", parser="lxml")
+    assert articles[0] == {
+        "title": "Budgetvote",
+        "author": "Ann Lee Bo Park",
+        "date": "October 1, 2026",
+        "description": "Teaserone",
+        "link": "https://x/1",
+        "image_url": "https://x/1.jpg",
+        "section": "news",
+    }
+    assert articles[1]["author"] == "" and articles[1]["image_url"] == ""
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"ok   {test.__name__}")
+    print(f"{len(tests)} tests passed")
+    sys.exit(0)